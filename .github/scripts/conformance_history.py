@@ -0,0 +1,178 @@
+# An append-only history of client conformance runs, used by generate_client_report.py
+#
+# Every conformance report is recorded once (keyed by its SHA-256 digest) with its
+# summary, the mean latency of the client invocations per subcommand and the duration
+# of every test. Recorded runs are never changed or removed.
+
+import sqlite3
+from pathlib import Path
+from statistics import median
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    report_sha256 TEXT NOT NULL UNIQUE,
+    client TEXT NOT NULL,
+    created REAL NOT NULL,
+    client_sha TEXT NOT NULL,
+    workflow_run TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    timeout INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS runs_client_created ON runs (client, created);
+
+-- Test node ids, so that durations refer to them by a small integer
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    nodeid TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS durations (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    test_id INTEGER NOT NULL REFERENCES tests (id),
+    duration REAL NOT NULL,
+    PRIMARY KEY (run_id, test_id)
+) WITHOUT ROWID;
+
+-- Client invocations per subcommand, not counting results replayed from a cache
+CREATE TABLE IF NOT EXISTS latency (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    subcommand TEXT NOT NULL,
+    invocations INTEGER NOT NULL,
+    wall_time REAL NOT NULL,
+    PRIMARY KEY (run_id, subcommand)
+) WITHOUT ROWID;
+"""
+
+# A test regressed if its latest duration is this many times its baseline duration...
+_REGRESSION_RATIO = 1.5
+# ... and at least this many seconds longer (short tests are noisy)
+_REGRESSION_MIN_SECONDS = 0.5
+# Minimum number of earlier runs with the test for a baseline
+_BASELINE_MIN_RUNS = 3
+
+
+class History:
+    def __init__(self, path: Path):
+        self.db = sqlite3.connect(path)
+        self.db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.db.close()
+
+    def append(self, result) -> bool:
+        """
+        Record the run of a `Result`, returning False if the report was recorded before
+        (or has no creation time).
+        """
+        if not result.results_found or result.created is None:
+            return False
+
+        with self.db:
+            cursor = self.db.execute(
+                "INSERT OR IGNORE INTO runs (report_sha256, client, created, client_sha, "
+                "workflow_run, total, passed, failed, timeout) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result.report_sha256,
+                    result.name,
+                    result.created,
+                    result.client_sha,
+                    result.workflow_run,
+                    result.total,
+                    result.passed,
+                    result.failed,
+                    result.timeout,
+                ),
+            )
+            if cursor.rowcount == 0:
+                return False
+            run_id = cursor.lastrowid
+
+            self.db.executemany(
+                "INSERT OR IGNORE INTO tests (nodeid) VALUES (?)",
+                [(nodeid,) for nodeid in result.durations],
+            )
+            self.db.executemany(
+                "INSERT INTO durations (run_id, test_id, duration) "
+                "SELECT ?, id, ? FROM tests WHERE nodeid = ?",
+                [(run_id, duration, nodeid) for nodeid, duration in result.durations.items()],
+            )
+            self.db.executemany(
+                "INSERT INTO latency (run_id, subcommand, invocations, wall_time) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, subcommand, invocations, wall_time)
+                    for subcommand, (invocations, wall_time) in result.latency.items()
+                ],
+            )
+        return True
+
+    def _run_ids(self, client: str, limit: int) -> list[int]:
+        """Return the ids of the last `limit` runs of `client`, oldest first"""
+        rows = self.db.execute(
+            "SELECT id FROM runs WHERE client = ? ORDER BY created DESC LIMIT ?", (client, limit)
+        )
+        return [run_id for (run_id,) in rows][::-1]
+
+    def latency_trends(self, client: str, limit: int) -> dict[str, list[tuple[float, float]]]:
+        """
+        Return the mean client invocation latency per subcommand of the last `limit` runs
+        of `client`, as (run creation time, seconds) in chronological order.
+        """
+        run_ids = self._run_ids(client, limit)
+        rows = self.db.execute(
+            "SELECT latency.subcommand, runs.created, latency.wall_time / latency.invocations "
+            "FROM latency JOIN runs ON runs.id = latency.run_id "
+            f"WHERE latency.run_id IN ({', '.join('?' * len(run_ids))}) "
+            "AND latency.invocations > 0 ORDER BY runs.created",
+            run_ids,
+        )
+
+        trends: dict[str, list[tuple[float, float]]] = {}
+        for subcommand, created, latency in rows:
+            trends.setdefault(subcommand, []).append((created, latency))
+        return trends
+
+    def duration_regressions(
+        self, client: str, baseline_runs: int
+    ) -> list[tuple[str, float, float]]:
+        """
+        Return the tests that took considerably longer in the last run of `client` than
+        in the `baseline_runs` runs before it, as (nodeid, median duration of the
+        baseline runs, duration of the last run), largest slowdown first.
+        """
+        run_ids = self._run_ids(client, baseline_runs + 1)
+        if len(run_ids) <= _BASELINE_MIN_RUNS:
+            return []
+        latest_run = run_ids[-1]
+
+        baseline: dict[str, list[float]] = {}
+        latest: dict[str, float] = {}
+        rows = self.db.execute(
+            "SELECT durations.run_id, tests.nodeid, durations.duration "
+            "FROM durations JOIN tests ON tests.id = durations.test_id "
+            f"WHERE durations.run_id IN ({', '.join('?' * len(run_ids))})",
+            run_ids,
+        )
+        for run_id, nodeid, duration in rows:
+            if run_id == latest_run:
+                latest[nodeid] = duration
+            else:
+                baseline.setdefault(nodeid, []).append(duration)
+
+        regressions = []
+        for nodeid, duration in latest.items():
+            durations = baseline.get(nodeid, [])
+            if len(durations) < _BASELINE_MIN_RUNS:
+                continue
+            expected = median(durations)
+            if (
+                duration > expected * _REGRESSION_RATIO
+                and duration - expected > _REGRESSION_MIN_SECONDS
+            ):
+                regressions.append((nodeid, expected, duration))
+
+        regressions.sort(key=lambda regression: regression[2] - regression[1], reverse=True)
+        return regressions
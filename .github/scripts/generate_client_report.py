@@ -1,11 +1,193 @@
 # Generate an html summary from client conformance results
 
 import argparse
+import hashlib
 import json
-from dataclasses import dataclass
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from datetime import UTC, datetime
+from functools import partial
+from html import escape
 from pathlib import Path
 
+from conformance_history import History
+
+# Especially interesting specific tests: nodeid -> Result attribute set if the test passed
+_FEATURE_TESTS = {
+    "test/test_bundle.py::test_verify[PATH-rekor2-happy-path]": "rekor2_verify",
+    "test/test_bundle.py::test_sign_verify_rekor2": "rekor2_sign",
+    "test/test_bundle.py::test_verify[PATH-rekor2-dsse-happy-path]": "dsse_hashedrekord",
+    "test/test_bundle.py::test_verify[PATH-managed-key-happy-path]": "managed_keys",
+}
+
+# Bump when the extracted data changes
+_CACHE_VERSION = 2
+
+_CHUNK_SIZE = 64 * 1024
+
+# Number of recorded runs per client in latency trends
+_TREND_RUNS = 30
+# Number of earlier runs per client that test durations are compared with
+_BASELINE_RUNS = 10
+
+# The characters that can follow a value in a JSON document
+_DELIMITERS = {" ", "\t", "\r", "\n", ",", ":", "]", "}"}
+
+
+class _JsonStream:
+    """
+    An incremental reader of a JSON document.
+
+    Values are decoded one at a time from a buffer that only holds the current value, so
+    that a report can be read without holding all of it (or all of its decoded objects)
+    in memory at once. test/cpython_release.py reads the CPython release data with a
+    copy of it.
+    """
+
+    def __init__(self, f) -> None:
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop the consumed part of the buffer
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character, "" at the end of the document"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill(_CHUNK_SIZE):
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        """Consume the next non-whitespace character, which must be one of `chars`"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"expected one of {chars!r}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next value"""
+        self.peek()
+        size = _CHUNK_SIZE
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                end = None
+            # A number may continue in the next chunk: a value is only complete if it is
+            # followed by a delimiter
+            if end is not None and (self.buffer[end : end + 1] in _DELIMITERS or self.eof):
+                self.pos = end
+                return value
+            # Grow the reads, so that a large value is decoded a bounded number of times
+            if not self._fill(size):
+                if end is not None:
+                    self.pos = end
+                    return value
+                raise ValueError("truncated JSON document")
+            size *= 2
+
+
+def _extract_test(extract: dict, test: dict) -> None:
+    """
+    Record the outcome of a `_FEATURE_TESTS` test, the duration of every test and the
+    wall time of the client invocations of every test in `extract`.
+    """
+    nodeid = test["nodeid"]
+    if nodeid in _FEATURE_TESTS:
+        extract["outcomes"][nodeid] = test["outcome"]
+
+    stages = [test[stage] for stage in ("setup", "call", "teardown") if stage in test]
+    extract["durations"][nodeid] = sum(stage.get("duration", 0.0) for stage in stages)
+
+    # Per subcommand: [invocations, total wall time], not counting cached results
+    for properties in test.get("user_properties", []):
+        for invocation in properties.get("client_invocations", []):
+            if not invocation.get("cached"):
+                latency = extract["latency"].setdefault(invocation["subcommand"], [0, 0.0])
+                latency[0] += 1
+                latency[1] += invocation["wall_time"]
+
+
+def _extract(report_path: Path) -> dict:
+    """
+    Stream-parse a pytest-json-report report, returning its creation time, its
+    environment, its summary, the outcomes of the `_FEATURE_TESTS` and the durations
+    and client latencies of all tests (see `_extract_test()`). The tests, with their
+    logs and output, are decoded one at a time and dropped.
+    """
+    extract: dict = {}
+    with report_path.open() as f:
+        stream = _JsonStream(f)
+        stream.expect("{")
+        while stream.peek() != "}":
+            key = stream.value()
+            stream.expect(":")
+            if key == "tests":
+                extract.update(outcomes={}, durations={}, latency={})
+                stream.expect("[")
+                while stream.peek() != "]":
+                    _extract_test(extract, stream.value())
+                    if stream.expect(",]") == "]":
+                        break
+                else:
+                    stream.expect("]")
+            elif key in ("created", "environment", "summary"):
+                extract[key] = stream.value()
+            else:
+                stream.value()
+            if stream.expect(",}") == "}":
+                break
+    return extract
+
+
+def _cached_extract(report_path: Path, cache_dir: Path | None) -> dict:
+    """
+    Return the `_extract()` of a report with the SHA-256 digest of the report as
+    "sha256", from `cache_dir` if the same report (by content) was extracted before.
+    """
+    digest = hashlib.sha256()
+    with report_path.open("rb") as report:
+        for chunk in iter(lambda: report.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    sha256 = digest.hexdigest()
+
+    if cache_dir is None:
+        return {**_extract(report_path), "sha256": sha256}
+
+    key = hashlib.sha256(f"{_CACHE_VERSION}\n{sorted(_FEATURE_TESTS)}\n{sha256}".encode())
+    cache_path = cache_dir / f"{key.hexdigest()}.json"
+
+    try:
+        with cache_path.open() as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        pass
+
+    extract = {**_extract(report_path), "sha256": sha256}
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Only ever replace complete files: other processes may be reading the cache
+    with tempfile.NamedTemporaryFile("w", dir=cache_dir, delete=False) as tmp:
+        json.dump(extract, tmp)
+    os.replace(tmp.name, cache_path)
+    return extract
+
 
 @dataclass
 class Result:
@@ -15,6 +197,7 @@ class Result:
     total: int = -1
     passed: int = -1
     failed: int = -1
+    timeout: int = -1
     xfailed: int = -1
     skipped: int = -1
     rekor2_verify: bool = False
@@ -24,16 +207,24 @@ class Result:
     client_sha: str = ""
     client_sha_url: str = ""
     workflow_run: str = ""
+    # For the history, see conformance_history.py
+    report_sha256: str = ""
+    created: float | None = None
+    durations: dict[str, float] = field(default_factory=dict)
+    latency: dict[str, list] = field(default_factory=dict)
 
-    def __init__(self, report_path: Path):
-        with report_path.open() as f:
-            data = json.load(f)
+    def __init__(self, report_path: Path, cache_dir: Path | None = None):
+        data = _cached_extract(report_path, cache_dir)
+        self.durations = data.get("durations", {})
+        self.latency = data.get("latency", {})
 
-        if data == {}:
+        if "summary" not in data:
             self.name = report_path.name.replace(".json", "")
             return  # no results found
 
         self.results_found = True
+        self.report_sha256 = data["sha256"]
+        self.created = data.get("created")
         environment = data.get("environment", {})
         self.name = environment.get("client_name", report_path.name.replace(".json", ""))
         self.url = environment.get("client_url", "")
@@ -43,25 +234,109 @@ class Result:
 
         summary = data["summary"]
         self.total = summary["total"]
-        self.passed = summary.get("passed", 0) + summary.get("subtests passed", 0)
+        # Tests carried forward from the last green run passed then, see `--incremental-manifest`
+        self.passed = (
+            summary.get("passed", 0)
+            + summary.get("subtests passed", 0)
+            + summary.get("carried_forward", 0)
+        )
         self.failed = summary.get("failed", 0) + summary.get("subtests failed", 0)
+        # Tests that failed because a client invocation timed out, see `--client-timeout`
+        self.timeout = summary.get("timeout", 0)
         self.xfailed = summary.get("xfailed", 0) + summary.get("subtests xfailed", 0)
         self.skipped = summary.get("skipped", 0) + summary.get("subtests skipped", 0)
 
         # look at some especially interesting specific tests
-        for test in data["tests"]:
-            nodeid = test["nodeid"]
-            if nodeid == "test/test_bundle.py::test_verify[PATH-rekor2-happy-path]":
-                self.rekor2_verify = test["outcome"] == "passed"
-            elif nodeid == "test/test_bundle.py::test_sign_verify_rekor2":
-                self.rekor2_sign = test["outcome"] == "passed"
-            elif nodeid == "test/test_bundle.py::test_verify[PATH-rekor2-dsse-happy-path]":
-                self.dsse_hashedrekord = test["outcome"] == "passed"
-            elif nodeid == "test/test_bundle.py::test_verify[PATH-managed-key-happy-path]":
-                self.managed_keys = test["outcome"] == "passed"
-
-
-def _generate_html(results: list[Result]):
+        for nodeid, outcome in data.get("outcomes", {}).items():
+            setattr(self, _FEATURE_TESTS[nodeid], outcome in ("passed", "carried_forward"))
+
+
+def _sparkline(points: list[tuple[float, float]], width: int = 200, height: int = 32) -> str:
+    """Render (time, value) points as an inline SVG line chart with a zero baseline"""
+    x_min, x_max = points[0][0], points[-1][0]
+    y_max = max(y for _, y in points) or 1.0
+    coordinates = " ".join(
+        f"{(x - x_min) / (x_max - x_min) * width if x_max > x_min else width:.1f},"
+        f"{height - y / y_max * height:.1f}"
+        for x, y in points
+    )
+    return (
+        f'<svg width="{width}" height="{height}" viewBox="-2 -2 {width + 4} {height + 4}">'
+        f'<polyline fill="none" stroke="#3366cc" stroke-width="1.5" points="{coordinates}"/>'
+        "</svg>"
+    )
+
+
+def _generate_trends_html(results: list[Result], history: History) -> str:
+    rows = ""
+    regression_rows = ""
+    for res in results:
+        latency_html = ""
+        for subcommand, points in sorted(history.latency_trends(res.name, _TREND_RUNS).items()):
+            latest = points[-1][1] * 1000
+            low, high = (min(y for _, y in points) * 1000, max(y for _, y in points) * 1000)
+            latency_html += (
+                f"<div>{subcommand}: {_sparkline(points)} {latest:.0f} ms "
+                f"(range {low:.0f}&ndash;{high:.0f} ms)</div>"
+            )
+        if latency_html:
+            rows += f"""
+                <tr>
+                    <td><strong>{res.name}</strong></td>
+                    <td>{latency_html}</td>
+                </tr>
+            """
+
+        for nodeid, expected, duration in history.duration_regressions(res.name, _BASELINE_RUNS):
+            regression_rows += f"""
+                <tr>
+                    <td>{res.name}</td>
+                    <td><code>{escape(nodeid)}</code></td>
+                    <td>{expected:.2f} s</td>
+                    <td>{duration:.2f} s</td>
+                    <td>+{100 * (duration - expected) / expected:.0f}%</td>
+                </tr>
+            """
+
+    if not regression_rows:
+        regression_rows = '<tr><td colspan="5">No test got considerably slower</td></tr>'
+
+    return f"""
+        <h2>Client latency</h2>
+        <p>Mean wall time of the client invocations per subcommand in the last
+        {_TREND_RUNS} recorded runs.</p>
+        <table>
+            <thead>
+                <tr>
+                    <th>Client</th>
+                    <th>Latency</th>
+                </tr>
+            </thead>
+            <tbody>
+            {rows}
+            </tbody>
+        </table>
+        <h2>Test duration regressions</h2>
+        <p>Tests that took considerably longer in the latest run of a client than in the
+        {_BASELINE_RUNS} runs before it (median).</p>
+        <table>
+            <thead>
+                <tr>
+                    <th>Client</th>
+                    <th>Test</th>
+                    <th>Before</th>
+                    <th>Latest</th>
+                    <th>Change</th>
+                </tr>
+            </thead>
+            <tbody>
+            {regression_rows}
+            </tbody>
+        </table>
+    """
+
+
+def _generate_html(results: list[Result], history: History | None = None):
     html = f"""
     <html>
     <head>
@@ -86,6 +361,7 @@ def _generate_html(results: list[Result]):
                     <th>Pass Rate</th>
                     <th>Passed</th>
                     <th>Failed</th>
+                    <th>Timed out</th>
                     <th>Skipped</th>
                     <th>Xfailed</th>
                     <th>Rekor v2</th>
@@ -98,7 +374,7 @@ def _generate_html(results: list[Result]):
     for res in results:
         if not res.results_found:
             status_class = "not-found"
-        elif res.failed == 0:
+        elif res.failed == 0 and res.timeout == 0:
             status_class = "passed"
         else:
             status_class = "failed"
@@ -120,6 +396,7 @@ def _generate_html(results: list[Result]):
                     <td>{f"{passrate}%" if res.results_found else ""}</td>
                     <td>{res.passed if res.results_found else ""}</td>
                     <td>{res.failed if res.results_found else ""}</td>
+                    <td>{res.timeout if res.results_found else ""}</td>
                     <td>{res.skipped if res.results_found else ""}</td>
                     <td>{res.xfailed if res.results_found else ""}</td>
                     <td>{rekor2 if res.results_found else ""}</td>
@@ -130,6 +407,10 @@ def _generate_html(results: list[Result]):
     html += """
             </tbody>
         </table>
+    """
+    if history is not None:
+        html += _generate_trends_html(results, history)
+    html += """
     </body>
     </html>
     """
@@ -140,16 +421,41 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--reports-dir", required=True)
     parser.add_argument("--output", required=True)
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="reuse the results extracted from reports with the same contents in this directory",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of reports to read concurrently (default: number of CPU cores)",
+    )
+    parser.add_argument(
+        "--history",
+        type=Path,
+        help="append the results to the history database at this path and show trends",
+    )
     args = parser.parse_args()
 
     # Read all client results
-    results: list[Result] = []
-    for report_path in Path(args.reports_dir).glob("**/*.json"):
-        results.append(Result(report_path))
+    report_paths = sorted(Path(args.reports_dir).glob("**/*.json"))
+    with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        results = list(executor.map(partial(Result, cache_dir=args.cache_dir), report_paths))
     results.sort(key=lambda result: result.name)
 
+    history = None
+    if args.history is not None:
+        history = History(args.history)
+        for result in results:
+            history.append(result)
+
     # Write summary HTML
     output_file = Path(args.output)
     output_file.parent.mkdir(parents=True, exist_ok=True)
     with output_file.open("w") as f:
-        f.write(_generate_html(results))
+        f.write(_generate_html(results, history))
+
+    if history is not None:
+        history.close()
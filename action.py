@@ -11,6 +11,8 @@ from pathlib import Path
 
 import pytest
 
+from test import matrix
+
 _SUMMARY = Path(os.getenv("GITHUB_STEP_SUMMARY")).open("a")  # type: ignore
 _RENDER_SUMMARY = os.getenv("GHA_SIGSTORE_CONFORMANCE_SUMMARY", "true") == "true"
 _DEBUG = os.getenv("GHA_SIGSTORE_CONFORMANCE_INTERNAL_BE_CAREFUL_DEBUG", "false") != "false"
@@ -27,16 +29,16 @@ def _debug(msg):
         print(f"\033[93mDEBUG: {msg}\033[0m", file=sys.stderr)
 
 
-def _sigstore_conformance(environment: str) -> int:
-    args = ["--json-report", "--json-report-file=conformance-report.json", "--durations=0"]
+def _pytest_args(environment: str) -> list[str]:
+    """
+    Return the pytest arguments for the configuration of the action, except the
+    entrypoint and the JSON report.
+    """
+    args = ["--durations=0"]
 
     if _DEBUG:
         args.extend(["-s", "-vv", "--showlocals"])
 
-    entrypoint = os.getenv("GHA_SIGSTORE_CONFORMANCE_ENTRYPOINT")
-    if entrypoint:
-        args.append(f"--entrypoint={entrypoint}")
-
     if environment == "staging":
         args.append("--staging")
     elif environment != "production":
@@ -46,6 +48,78 @@ def _sigstore_conformance(environment: str) -> int:
     if skip_signing:
         args.extend(["--skip-signing"])
 
+    verify_batch = os.getenv("GHA_SIGSTORE_CONFORMANCE_VERIFY_BATCH", "false").lower() == "true"
+    if verify_batch:
+        args.append("--verify-batch")
+
+    cpython_release_sweep = os.getenv("GHA_SIGSTORE_CONFORMANCE_CPYTHON_RELEASE_SWEEP", "false")
+    if cpython_release_sweep.lower() == "true":
+        args.append("--cpython-release-sweep")
+    if cpython_release_shard := os.getenv("GHA_SIGSTORE_CONFORMANCE_CPYTHON_RELEASE_SHARD"):
+        args.append(f"--cpython-release-shard={cpython_release_shard}")
+
+    # Tests are independent of each other: pytest-xdist runs each worker in its own
+    # process (with its own workspaces and cwd) and pytest-json-report merges the results
+    workers = os.getenv("GHA_SIGSTORE_CONFORMANCE_WORKERS", "1")
+    if workers != "1":
+        args.append(f"--numprocesses={workers}")
+
+    if verify_result_cache := os.getenv("GHA_SIGSTORE_CONFORMANCE_VERIFY_RESULT_CACHE"):
+        args.append(f"--verify-result-cache={verify_result_cache}")
+
+    # Absolute, so that they are the same paths in the working directories of matrix runs
+    for build_path in os.getenv("GHA_SIGSTORE_CONFORMANCE_CLIENT_BUILD", "").split():
+        args.append(f"--client-build={os.path.abspath(build_path)}")
+
+    if incremental_manifest := os.getenv("GHA_SIGSTORE_CONFORMANCE_INCREMENTAL_MANIFEST"):
+        args.append(f"--incremental-manifest={incremental_manifest}")
+
+    for timeout in os.getenv("GHA_SIGSTORE_CONFORMANCE_CLIENT_TIMEOUTS", "").split():
+        args.append(f"--client-timeout={timeout}")
+
+    local_services = os.getenv("GHA_SIGSTORE_CONFORMANCE_LOCAL_SERVICES", "false")
+    if local_services.lower() == "true":
+        args.append("--local-services")
+
+    large_artifact_size = os.getenv("GHA_SIGSTORE_CONFORMANCE_LARGE_ARTIFACT_SIZE", "0")
+    if large_artifact_size != "0":
+        args.append(f"--large-artifact-size={large_artifact_size}")
+
+    load_signatures = os.getenv("GHA_SIGSTORE_CONFORMANCE_LOAD_SIGNATURES", "0")
+    if load_signatures != "0":
+        args.extend([f"--load-signatures={load_signatures}", "--load-report=load-report.json"])
+
+    benchmark_rounds = os.getenv("GHA_SIGSTORE_CONFORMANCE_BENCHMARK_ROUNDS", "0")
+    if benchmark_rounds != "0":
+        args.extend(
+            [f"--benchmark-rounds={benchmark_rounds}", "--benchmark-report=benchmark-report.json"]
+        )
+
+    return args
+
+
+def _inject_metadata(report_path: Path, report_env: dict[str, str]) -> None:
+    with report_path.open("r+") as f:
+        report_data = json.load(f)
+        if "environment" not in report_data:
+            report_data["environment"] = {}
+        report_data["environment"].update(report_env)
+        f.seek(0)
+        json.dump(report_data, f, indent=4)
+        f.truncate()
+
+
+def _sigstore_conformance(environment: str) -> int:
+    args = [
+        *_pytest_args(environment),
+        "--json-report",
+        "--json-report-file=conformance-report.json",
+    ]
+
+    entrypoint = os.getenv("GHA_SIGSTORE_CONFORMANCE_ENTRYPOINT")
+    if entrypoint:
+        args.append(f"--entrypoint={entrypoint}")
+
     print(f"running sigstore-conformance against Sigstore {environment} infrastructure")
     _debug(f"running: sigstore-conformance {[str(a) for a in args]}")
 
@@ -65,21 +139,60 @@ def _sigstore_conformance(environment: str) -> int:
         report_env["client_url"] = client_url
 
     # Inject metadata into the report
-    with open("conformance-report.json", "r+") as f:
-        report_data = json.load(f)
-        if "environment" not in report_data:
-            report_data["environment"] = {}
-        report_data["environment"].update(report_env)
-        f.seek(0)
-        json.dump(report_data, f, indent=4)
-        f.truncate()
+    _inject_metadata(Path("conformance-report.json"), report_env)
 
     return status
 
 
+def _sigstore_conformance_matrix(environment: str, clients_spec: str) -> int:
+    """
+    Run the test suite for several clients side by side, see test/matrix.py.
+    """
+    clients = matrix.parse_clients(
+        clients_spec, os.getenv("GHA_SIGSTORE_CONFORMANCE_CLIENT_XFAIL", "")
+    )
+    matrix_dir = Path("conformance-matrix").absolute()
+
+    args = _pytest_args(environment)
+    args.extend(
+        matrix.prepare(
+            matrix_dir,
+            _ACTION_PATH,
+            staging=environment == "staging",
+            signing="--skip-signing" not in args,
+            local_services="--local-services" in args,
+        )
+    )
+
+    names = ", ".join(client.name for client in clients)
+    print(f"running sigstore-conformance for {names} against Sigstore {environment} infrastructure")
+    _debug(f"running: sigstore-conformance {[str(a) for a in args]}")
+
+    statuses = matrix.run(clients, [str(_ACTION_PATH / "test"), *args], matrix_dir)
+
+    report_env = {}
+    if workflow_run := os.getenv("GHA_SIGSTORE_CONFORMANCE_WORKFLOW_RUN"):
+        report_env["workflow_run"] = workflow_run
+    for client in clients:
+        report_path = matrix.report_path(matrix_dir, client)
+        if report_path.exists():
+            _inject_metadata(report_path, {**report_env, "client_name": client.name})
+        print(f"{client.name}: exit status {statuses[client.name]}")
+
+    matrix_diff = matrix.diff(clients, matrix_dir)
+    with (matrix_dir / "diff.json").open("w") as f:
+        json.dump(matrix_diff, f, indent=4)
+    _summary(matrix.diff_markdown(matrix_diff))
+
+    return next((status for status in statuses.values() if status != 0), 0)
+
+
 # Run against chosen environment
 environment = os.getenv("GHA_SIGSTORE_CONFORMANCE_ENVIRONMENT", "production")
-status = _sigstore_conformance(environment)
+if clients_spec := os.getenv("GHA_SIGSTORE_CONFORMANCE_ENTRYPOINTS", "").strip():
+    status = _sigstore_conformance_matrix(environment, clients_spec)
+else:
+    status = _sigstore_conformance(environment)
 
 if status == 0:
     _summary("🎉 sigstore-conformance exited successfully")
@@ -0,0 +1,233 @@
+"""
+An asyncio counterpart of `SigstoreClient`.
+
+`AsyncSigstoreClient` runs every invocation in its own process and reads its output
+from the event loop, so that many invocations can be in flight from a single event loop
+without a thread per blocked process.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import subprocess
+import time
+from collections.abc import Callable
+from functools import singledispatchmethod
+from typing import TYPE_CHECKING
+
+from .client import (
+    _CLIENT_ERROR_MSG,
+    _INVOCATIONS,
+    BundleMaterials,
+    ClientFail,
+    ClientTimeout,
+    Invocation,
+    VerificationMaterials,
+    _BaseClient,
+    _kill_process_group,
+    _max_rss,
+)
+from .result_cache import VerifyResultCache
+
+if TYPE_CHECKING:
+    import resource
+
+
+class AsyncSigstoreClient(_BaseClient):
+    """
+    A wrapper around the Sigstore client under test with coroutine versions of the
+    `SigstoreClient` methods.
+
+    Unlike `SigstoreClient`, the client keeps no state of its last invocation: `run()`
+    returns the result of the invocation, and concurrent calls are independent. A client
+    must only be used from one event loop.
+    """
+
+    def __init__(
+        self,
+        entrypoint: str,
+        identity_token: str,
+        staging: bool,
+        concurrency: int = 1,
+        timeouts: dict[str, float] | None = None,
+        stderr_handler: Callable[[str], None] | None = None,
+        result_cache: VerifyResultCache | None = None,
+    ) -> None:
+        """
+        Create a new `AsyncSigstoreClient`.
+
+        At most `concurrency` client processes run at the same time. Processes that take
+        longer than their timeout in `timeouts` (see `SigstoreClient`) are killed, with
+        all their children.
+
+        If `stderr_handler` is given, it is called with every line the client writes to
+        stderr as soon as it is written.
+
+        If `result_cache` is given, verification results are recorded in it and replayed
+        from it instead of invoking the client again.
+        """
+        super().__init__(entrypoint, identity_token, staging, timeouts)
+        self.concurrency = concurrency
+        self.stderr_handler = stderr_handler
+        self.result_cache = result_cache
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def _read_stderr(self, stream: asyncio.StreamReader) -> bytes:
+        lines = []
+        while line := await stream.readline():
+            lines.append(line)
+            if self.stderr_handler is not None:
+                self.stderr_handler(line.decode(errors="replace").rstrip("\n"))
+        return b"".join(lines)
+
+    async def _exec(
+        self, full_command: list[str], timeout: float | None
+    ) -> tuple[subprocess.CompletedProcess, resource.struct_rusage, bool]:
+        """
+        Execute a client command in a new process, killing it after `timeout` seconds.
+
+        Returns the result of the command, its resource usage and whether it timed out.
+        """
+        loop = asyncio.get_running_loop()
+
+        # The client gets its own process group, so that a timeout also kills the
+        # processes started by wrapper scripts. The process is not an asyncio subprocess:
+        # its child watcher would reap it before we can, losing its rusage
+        process = subprocess.Popen(
+            full_command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+        streams = []
+        for pipe in (process.stdout, process.stderr):
+            reader = asyncio.StreamReader()
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), pipe)
+            streams.append(reader)
+        stdout_stream, stderr_stream = streams
+
+        output = asyncio.gather(stdout_stream.read(), self._read_stderr(stderr_stream))
+        timed_out = False
+        try:
+            stdout, stderr = await asyncio.wait_for(output, timeout)
+        except TimeoutError:
+            _kill_process_group(process.pid)
+            stdout, stderr = b"", b""
+            timed_out = True
+
+        # Reap the process ourselves to get its rusage, as `run_measured()` does. It has
+        # closed its output or was killed, so this only blocks a thread briefly
+        _, status, rusage = await asyncio.to_thread(os.wait4, process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+        completed_process = subprocess.CompletedProcess(
+            full_command,
+            process.returncode,
+            stdout.decode(errors="replace"),
+            stderr.decode(errors="replace"),
+        )
+        return completed_process, rusage, timed_out
+
+    async def run(self, *args) -> subprocess.CompletedProcess:
+        """
+        Execute a command against the Sigstore client, returning its result.
+
+        Raises `ClientFail` if the client fails and `ClientTimeout` if it times out.
+        """
+        full_command = [self.entrypoint, *[str(arg) for arg in args]]
+        timeout = self.timeout_for(full_command[1]) if args else self.timeouts.get("*")
+
+        # The cache hashes the input files and reads and writes cache entries: keep that
+        # off the event loop
+        result_cache = self.result_cache
+        cache_key = None
+        completed_process = None
+        if result_cache is not None and args and args[0] == "verify-bundle":
+            cache_key = await asyncio.to_thread(result_cache.key, full_command[1:])
+            completed_process = await asyncio.to_thread(result_cache.get, cache_key, full_command)
+
+        start = time.perf_counter()
+        cached = completed_process is not None
+        timed_out = False
+        rusage = None
+        if completed_process is None:
+            async with self._semaphore:
+                start = time.perf_counter()
+                completed_process, rusage, timed_out = await self._exec(full_command, timeout)
+
+            if not timed_out and result_cache is not None and cache_key is not None:
+                await asyncio.to_thread(
+                    result_cache.put, cache_key, full_command[1:], completed_process
+                )
+
+        _INVOCATIONS.append(
+            Invocation(
+                subcommand=full_command[1] if len(full_command) > 1 else "",
+                exitcode=completed_process.returncode,
+                server_mode=False,
+                wall_time=0.0 if cached else time.perf_counter() - start,
+                user_time=rusage.ru_utime if rusage else None,
+                system_time=rusage.ru_stime if rusage else None,
+                max_rss=_max_rss(rusage) if rusage else None,
+                stdout_bytes=len(completed_process.stdout.encode()),
+                stderr_bytes=len(completed_process.stderr.encode()),
+                cached=cached,
+                timed_out=timed_out,
+            )
+        )
+
+        if timed_out:
+            raise ClientTimeout(f"{' '.join(full_command)} did not finish within {timeout} seconds")
+
+        if completed_process.returncode != 0:
+            raise ClientFail(
+                _CLIENT_ERROR_MSG.format(
+                    exitcode=completed_process.returncode,
+                    command=" ".join(completed_process.args),
+                    stdout=completed_process.stdout,
+                    stderr=completed_process.stderr,
+                )
+            )
+
+        return completed_process
+
+    @singledispatchmethod
+    async def sign(self, materials: VerificationMaterials) -> subprocess.CompletedProcess:
+        """
+        Sign an artifact with the Sigstore client, see `SigstoreClient.sign()`.
+        """
+        raise NotImplementedError(f"Cannot sign with {type(materials)}")
+
+    @sign.register
+    async def _sign_for_bundle(self, materials: BundleMaterials) -> subprocess.CompletedProcess:
+        self._check_token_lifetime()
+
+        completed_process = await self.run(*self.build_sign_args(materials))
+
+        materials.identity = self.identity
+        materials.issuer = self.issuer
+        return completed_process
+
+    @singledispatchmethod
+    async def verify(self, materials: VerificationMaterials) -> subprocess.CompletedProcess:
+        """
+        Verify an artifact with the Sigstore client, see `SigstoreClient.verify()`.
+        """
+        raise NotImplementedError(f"Cannot verify with {type(materials)}")
+
+    @verify.register
+    async def _verify_artifact_for_bundle(
+        self, materials: BundleMaterials
+    ) -> subprocess.CompletedProcess:
+        return await self.run(*self.build_verify_args(materials))
+
+    @singledispatchmethod
+    async def verify_digest(self, materials: VerificationMaterials) -> subprocess.CompletedProcess:
+        raise NotImplementedError(f"Cannot verify with {type(materials)}")
+
+    @verify_digest.register
+    async def _verify_digest_for_bundle(
+        self, materials: BundleMaterials
+    ) -> subprocess.CompletedProcess:
+        return await self.run(*self.build_verify_args(materials, digest=True))
@@ -1,13 +1,29 @@
 from __future__ import annotations
 
-import hashlib
 import json
+import os
+import select
+import signal
 import subprocess
-from base64 import b64decode
-from contextlib import contextmanager
+import sys
+import threading
+import time
+from contextlib import contextmanager, suppress
+from dataclasses import dataclass
 from datetime import datetime
 from functools import singledispatchmethod
 from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import TYPE_CHECKING
+
+from .digests import file_sha256
+from .oidc import OidcTokenError, token_claims
+from .result_cache import VerifyResultCache
+
+if TYPE_CHECKING:
+    import resource
+
+    from .fixture_index import FixtureCase
 
 CERTIFICATE_IDENTITY = (
     "https://github.com/sigstore-conformance/extremely-dangerous-public-oidc-beacon/.github/"
@@ -31,6 +47,12 @@ Exit code: {exitcode}
 """
 
 
+# Version of the optional server mode of the CLI protocol, see docs/cli_protocol.md
+_SERVER_PROTOCOL_VERSION = 1
+# Seconds to wait for a client to announce server mode before falling back to exec
+_SERVER_HANDSHAKE_TIMEOUT = 10.0
+
+
 class ClientFail(Exception):
     pass
 
@@ -39,6 +61,295 @@ class ClientUnexpectedSuccess(Exception):
     pass
 
 
+class ClientTimeout(Exception):
+    """
+    A client invocation that did not finish in time and was killed.
+    """
+
+
+@dataclass
+class Invocation:
+    """
+    Resource usage of a single client invocation.
+
+    CPU times and peak RSS are only known for invocations that run in their own process
+    (not in server mode). Invocations replayed from the verification result cache are
+    marked as `cached`, invocations that were killed after their timeout as `timed_out`.
+    """
+
+    subcommand: str
+    exitcode: int
+    server_mode: bool
+    wall_time: float
+    user_time: float | None
+    system_time: float | None
+    max_rss: int | None
+    stdout_bytes: int
+    stderr_bytes: int
+    cached: bool = False
+    timed_out: bool = False
+
+
+# Invocations of all clients since the last call to `drain_invocations()`
+_INVOCATIONS: list[Invocation] = []
+
+
+def drain_invocations() -> list[Invocation]:
+    """
+    Return and forget the invocations recorded since the last call.
+    """
+    invocations = _INVOCATIONS[:]
+    del _INVOCATIONS[: len(invocations)]
+    return invocations
+
+
+def _kill_process_group(pid: int) -> None:
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def _max_rss(rusage: resource.struct_rusage) -> int:
+    """Return the peak RSS of a process in bytes, from its rusage"""
+    # ru_maxrss is in kilobytes on Linux but in bytes on macOS
+    return rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+
+
+def run_measured(
+    full_command: list[str], timeout: float | None = None
+) -> tuple[subprocess.CompletedProcess, Invocation]:
+    """
+    Execute a client command in a new process, measuring its resource usage.
+
+    If the command does not finish within `timeout` seconds, its process group is
+    killed and the invocation is marked as `timed_out`.
+    """
+    start = time.perf_counter()
+    # With a timeout, the client gets its own process group, so that a timeout also
+    # kills the processes started by wrapper scripts
+    process = subprocess.Popen(
+        full_command,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=timeout is not None,
+    )
+    stdout_pipe, stderr_pipe = process.stdout, process.stderr
+    assert stdout_pipe and stderr_pipe
+
+    expired = threading.Event()
+    timer = None
+    if timeout is not None:
+
+        def _expire() -> None:
+            expired.set()
+            _kill_process_group(process.pid)
+
+        timer = threading.Timer(timeout, _expire)
+        timer.start()
+
+    # Read both pipes to completion, then reap the process ourselves to get its rusage
+    stderr: list[bytes] = []
+    stderr_reader = threading.Thread(target=lambda: stderr.append(stderr_pipe.read()))
+    stderr_reader.start()
+    stdout = stdout_pipe.read()
+    stderr_reader.join()
+    stdout_pipe.close()
+    stderr_pipe.close()
+
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall_time = time.perf_counter() - start
+    if timer is not None:
+        timer.cancel()
+    process.returncode = os.waitstatus_to_exitcode(status)
+
+    invocation = Invocation(
+        subcommand=str(full_command[1]) if len(full_command) > 1 else "",
+        exitcode=process.returncode,
+        server_mode=False,
+        wall_time=wall_time,
+        user_time=rusage.ru_utime,
+        system_time=rusage.ru_stime,
+        max_rss=_max_rss(rusage),
+        stdout_bytes=len(stdout),
+        stderr_bytes=len(stderr[0]),
+        # The timer may fire just after the client exited on its own
+        timed_out=expired.is_set() and process.returncode == -signal.SIGKILL,
+    )
+    completed_process = subprocess.CompletedProcess(
+        full_command,
+        process.returncode,
+        stdout.decode(errors="replace"),
+        stderr[0].decode(errors="replace"),
+    )
+
+    return completed_process, invocation
+
+
+class _ClientServer:
+    """
+    A long-lived client process in the optional server mode of the CLI protocol.
+
+    Each request is the argument list of a regular client invocation; the client
+    responds with the exit code and output of that invocation.
+    """
+
+    def __init__(self, entrypoint: str) -> None:
+        self.process = subprocess.Popen(
+            [entrypoint, "serve"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+        self.lock = threading.Lock()
+        # Output that was read but not returned by `_readline()` yet
+        self._buffer = bytearray()
+
+    @classmethod
+    def start(cls, entrypoint: str) -> _ClientServer | None:
+        """
+        Launch the client in server mode, returning None if the client does not
+        support it.
+        """
+        try:
+            server = cls(entrypoint)
+        except OSError:
+            return None
+
+        line = server._readline(_SERVER_HANDSHAKE_TIMEOUT)
+        try:
+            handshake = json.loads(line) if line else None
+        except ValueError:
+            handshake = None
+
+        if not isinstance(handshake, dict) or handshake.get("version") != _SERVER_PROTOCOL_VERSION:
+            if line is None:
+                server.kill()
+            else:
+                server.close()
+            return None
+
+        return server
+
+    def _readline(self, timeout: float | None) -> bytes | None:
+        """
+        Return the next line of output, b"" if the process closed its output, or None if
+        no complete line arrives within `timeout` seconds.
+
+        Output is read without blocking, so that a partial line does not block beyond
+        the deadline.
+        """
+        assert self.process.stdout
+        fd = self.process.stdout.fileno()
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while (end := self._buffer.find(b"\n")) < 0:
+            remaining = None if deadline is None else max(deadline - time.monotonic(), 0)
+            ready, _, _ = select.select([fd], [], [], remaining)
+            if not ready:
+                return None
+            chunk = os.read(fd, 64 * 1024)
+            if not chunk:
+                # An incomplete last line is not a response
+                return b""
+            self._buffer += chunk
+
+        line = bytes(self._buffer[: end + 1])
+        del self._buffer[: end + 1]
+        return line
+
+    def run(
+        self, full_command: list[str], timeout: float | None = None
+    ) -> subprocess.CompletedProcess:
+        """
+        Execute a single client invocation in the server process.
+
+        Raises `ClientTimeout` if the client does not respond within `timeout` seconds:
+        the server process is killed, since it may still be busy with the request.
+        """
+        request = {"cwd": os.getcwd(), "args": [str(arg) for arg in full_command[1:]]}
+
+        with self.lock:
+            assert self.process.stdin and self.process.stdout
+            try:
+                self.process.stdin.write(json.dumps(request).encode() + b"\n")
+                self.process.stdin.flush()
+                line = self._readline(timeout)
+            except OSError:
+                line = b""
+
+            if line is None:
+                self.kill()
+                raise ClientTimeout(
+                    f"{' '.join(map(str, full_command))} did not finish within {timeout} seconds"
+                )
+
+        if not line:
+            self.close()
+            return subprocess.CompletedProcess(
+                full_command,
+                self.process.returncode,
+                "",
+                "client server mode process exited unexpectedly",
+            )
+
+        response = json.loads(line)
+        return subprocess.CompletedProcess(
+            full_command, response["exitcode"], response["stdout"], response["stderr"]
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def kill(self) -> None:
+        """
+        Kill the server process and its children, e.g. when it did not respond in time.
+        """
+        _kill_process_group(self.process.pid)
+        self.process.wait()
+
+    def close(self) -> None:
+        if self.process.stdin:
+            with suppress(OSError):
+                self.process.stdin.close()
+        try:
+            self.process.wait(timeout=_SERVER_HANDSHAKE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+# Server mode processes per entrypoint, None if the client does not support server mode
+_SERVERS: dict[str, _ClientServer | None] = {}
+
+
+def _server_for(entrypoint: str) -> _ClientServer | None:
+    """
+    Return the server mode process for `entrypoint`, negotiating it on first use.
+    """
+    if entrypoint not in _SERVERS:
+        _SERVERS[entrypoint] = _ClientServer.start(entrypoint)
+
+    server = _SERVERS[entrypoint]
+    if server is not None and not server.alive:
+        # The client crashed: do not try server mode again
+        _SERVERS[entrypoint] = server = None
+
+    return server
+
+
+def close_servers() -> None:
+    """
+    Shut down all server mode client processes.
+    """
+    for server in _SERVERS.values():
+        if server is not None:
+            server.close()
+    _SERVERS.clear()
+
+
 class VerificationMaterials:
     """
     A wrapper around verification materials. Materials are bundles.
@@ -73,6 +384,8 @@ class BundleMaterials(VerificationMaterials):
     key: Path
     identity: str
     issuer: str
+    # SHA-256 of the artifact if known in advance, see `from_case()`
+    artifact_digest: str | None = None
 
     @classmethod
     def from_dir(cls, path: Path) -> BundleMaterials:
@@ -114,6 +427,25 @@ class BundleMaterials(VerificationMaterials):
 
         return mats
 
+    @classmethod
+    def from_case(cls, case: FixtureCase) -> BundleMaterials:
+        """Load Verification materials from an indexed fixture directory
+
+        This is equivalent to `from_dir()` but does not access the fixture files.
+        """
+        mats = cls()
+        mats.bundle = Path(case.bundle)
+        if case.trusted_root is not None:
+            mats.trusted_root = Path(case.trusted_root)
+        if case.key is not None:
+            mats.key = Path(case.key)
+        mats.identity = case.identity
+        mats.issuer = case.issuer
+        mats.artifact = Path(case.artifact)
+        mats.artifact_digest = case.digests["artifact"]
+
+        return mats
+
     @classmethod
     def from_artifact_path(cls, input: Path) -> BundleMaterials:
         mats = cls()
@@ -126,7 +458,139 @@ class BundleMaterials(VerificationMaterials):
         return self.bundle.exists()
 
 
-class SigstoreClient:
+class _BaseClient:
+    """
+    The client under test and the identity token to sign with: the state and command
+    construction shared by `SigstoreClient` and `AsyncSigstoreClient`.
+    """
+
+    def __init__(
+        self,
+        entrypoint: str,
+        identity_token: str,
+        staging: bool,
+        timeouts: dict[str, float] | None = None,
+    ) -> None:
+        self.entrypoint = entrypoint
+        self.identity_token = identity_token
+        self.staging = staging
+        self.timeouts = timeouts or {}
+
+        # Dig issuer and identity from the token
+        try:
+            payload_json = token_claims(self.identity_token)
+            self.identity: str = payload_json["email"]
+            self.issuer: str = payload_json["iss"]
+            self.expiry = datetime.fromtimestamp(payload_json["exp"])
+        except (OidcTokenError, KeyError, ValueError) as e:
+            raise RuntimeError("Test suite failed to parse OIDC token") from e
+
+    def timeout_for(self, subcommand: str) -> float | None:
+        """
+        Return the timeout in seconds for invocations of `subcommand`: its own timeout,
+        else the timeout for all subcommands ("*"), else None.
+        """
+        return self.timeouts.get(subcommand, self.timeouts.get("*"))
+
+    def _check_token_lifetime(self) -> None:
+        lifetime = int((self.expiry - datetime.now()).total_seconds())
+        if lifetime < 0:
+            raise RuntimeError(
+                "Signing test infrastructure failure: Test OIDC token expired "
+                f"{-lifetime} seconds ago"
+            )
+
+    def build_sign_args(self, materials: BundleMaterials) -> list[str]:
+        args = ["sign-bundle"]
+        if self.staging:
+            args.append("--staging")
+
+        statement = getattr(materials, "statement", None)
+        if statement is not None:
+            args.append("--in-toto")
+            artifact_to_sign = statement
+        else:
+            artifact_to_sign = materials.artifact
+
+        args.extend(
+            [
+                "--identity-token",
+                self.identity_token,
+                "--bundle",
+                str(materials.bundle),
+            ]
+        )
+        if getattr(materials, "trusted_root", None) is not None:
+            args.extend(["--trusted-root", str(materials.trusted_root)])
+        if getattr(materials, "signing_config", None) is not None:
+            args.extend(["--signing-config", str(materials.signing_config)])
+
+        args.append(str(artifact_to_sign))
+
+        return args
+
+    def _verify_input(self, materials: BundleMaterials, digest: bool) -> str:
+        """
+        Return the FILE_OR_DIGEST input of a verification.
+        """
+        if not digest:
+            return str(materials.artifact)
+
+        artifact_digest = getattr(materials, "artifact_digest", None)
+        if artifact_digest is None:
+            artifact_digest = file_sha256(materials.artifact)
+        return f"sha256:{artifact_digest}"
+
+    def build_verify_args(self, materials: BundleMaterials, digest: bool = False) -> list[str]:
+        args = ["verify-bundle"]
+        if self.staging:
+            args.append("--staging")
+
+        args.extend(["--bundle", str(materials.bundle)])
+
+        if getattr(materials, "key", None) is not None:
+            args.extend(["--key", str(materials.key)])
+        else:
+            args.extend(
+                [
+                    "--certificate-identity",
+                    materials.identity,
+                    "--certificate-oidc-issuer",
+                    materials.issuer,
+                ]
+            )
+
+        if getattr(materials, "trusted_root", None) is not None:
+            args.extend(["--trusted-root", str(materials.trusted_root)])
+
+        args.append(self._verify_input(materials, digest))
+
+        return args
+
+    def build_verify_manifest_entry(
+        self, materials: BundleMaterials, digest: bool = False
+    ) -> dict[str, str]:
+        """
+        Return the `verify-bundles` manifest entry that stands for the `verify-bundle`
+        invocation of `build_verify_args()`.
+        """
+        entry = {"bundle": str(materials.bundle)}
+
+        if getattr(materials, "key", None) is not None:
+            entry["key"] = str(materials.key)
+        else:
+            entry["certificate_identity"] = materials.identity
+            entry["certificate_oidc_issuer"] = materials.issuer
+
+        if getattr(materials, "trusted_root", None) is not None:
+            entry["trusted_root"] = str(materials.trusted_root)
+
+        entry["file_or_digest"] = self._verify_input(materials, digest)
+
+        return entry
+
+
+class SigstoreClient(_BaseClient):
     """
     A wrapper around the Sigstore client under test that provides helpers to
     access client functionality.
@@ -138,51 +602,121 @@ class SigstoreClient:
     support: bundles. The overloads of those methods should not be called directly.
     """
 
-    def __init__(self, entrypoint: str, identity_token: str, staging: bool) -> None:
+    def __init__(
+        self,
+        entrypoint: str,
+        identity_token: str,
+        staging: bool,
+        server_mode: bool = True,
+        result_cache: VerifyResultCache | None = None,
+        timeouts: dict[str, float] | None = None,
+    ) -> None:
         """
         Create a new `SigstoreClient`.
 
         `entrypoint` is the command to invoke the Sigstore client.
+
+        If `server_mode` is set, the client is asked to run in the optional server mode
+        of the CLI protocol: clients that do not support it are executed once per call.
+
+        If `result_cache` is given, verification results are recorded in it and replayed
+        from it instead of invoking the client again.
+
+        `timeouts` maps subcommands (or "*" for all of them) to the seconds an
+        invocation may take before the client is killed and `ClientTimeout` is raised.
         """
-        self.entrypoint = entrypoint
-        self.identity_token = identity_token
+        super().__init__(entrypoint, identity_token, staging, timeouts)
         self.completed_process: subprocess.CompletedProcess | None = None
-        self.staging = staging
-
-        # Dig issuer and identity from the token
-        try:
-            payload = self.identity_token.split(".")[1]
-            payload += "=" * (4 - len(payload) % 4)
-            payload_json = json.loads(b64decode(payload))
-            self.identity: str = payload_json["email"]
-            self.issuer: str = payload_json["iss"]
-            self.expiry = datetime.fromtimestamp(payload_json["exp"])
-        except (IndexError, KeyError, ValueError) as e:
-            raise RuntimeError("Test suite failed to parse OIDC token") from e
+        self.last_invocation: Invocation | None = None
+        self.server_mode = server_mode
+        self.result_cache = result_cache
 
     def run(self, *args) -> None:
         """
         Execute a command against the Sigstore client.
+
+        Raises `ClientFail` if the client fails and `ClientTimeout` if it times out.
         """
         self.completed_process = None
+        self.last_invocation = None
         full_command = [self.entrypoint, *args]
-
-        try:
-            self.completed_process = subprocess.run(
-                full_command,
-                text=True,
-                capture_output=True,
-                check=True,
+        timeout = self.timeout_for(str(args[0])) if args else self.timeouts.get("*")
+
+        request = [str(arg) for arg in args]
+        cache_key = None
+        cached_process = None
+        if self.result_cache is not None and args and args[0] == "verify-bundle":
+            cache_key = self.result_cache.key(request)
+            cached_process = self.result_cache.get(cache_key, full_command)
+
+        server = None
+        if self.server_mode and cached_process is None:
+            server = _server_for(self.entrypoint)
+
+        if cached_process is not None:
+            completed_process = cached_process
+            invocation = Invocation(
+                subcommand=str(args[0]),
+                exitcode=completed_process.returncode,
+                server_mode=False,
+                wall_time=0.0,
+                user_time=None,
+                system_time=None,
+                max_rss=None,
+                stdout_bytes=len(completed_process.stdout.encode()),
+                stderr_bytes=len(completed_process.stderr.encode()),
+                cached=True,
+            )
+        elif server is not None:
+            start = time.perf_counter()
+            timed_out = False
+            try:
+                completed_process = server.run(full_command, timeout)
+            except ClientTimeout:
+                completed_process = subprocess.CompletedProcess(
+                    full_command, -signal.SIGKILL, "", ""
+                )
+                timed_out = True
+            invocation = Invocation(
+                subcommand=str(args[0]) if args else "",
+                exitcode=completed_process.returncode,
+                server_mode=True,
+                wall_time=time.perf_counter() - start,
+                user_time=None,
+                system_time=None,
+                max_rss=None,
+                stdout_bytes=len(completed_process.stdout.encode()),
+                stderr_bytes=len(completed_process.stderr.encode()),
+                timed_out=timed_out,
             )
-        except subprocess.CalledProcessError as cpe:
+        else:
+            completed_process, invocation = run_measured(full_command, timeout)
+        _INVOCATIONS.append(invocation)
+        self.last_invocation = invocation
+
+        # Do not record the failures of a crashed server mode client, or timeouts
+        crashed = server is not None and not server.alive
+        recordable = not crashed and not invocation.timed_out
+        if cache_key is not None and cached_process is None and recordable:
+            assert self.result_cache
+            self.result_cache.put(cache_key, request, completed_process)
+
+        if invocation.timed_out:
+            raise ClientTimeout(
+                f"{' '.join(map(str, full_command))} did not finish within {timeout} seconds"
+            )
+
+        if completed_process.returncode != 0:
             msg = _CLIENT_ERROR_MSG.format(
-                exitcode=cpe.returncode,
-                command=" ".join(map(str, cpe.args)),
-                stdout=cpe.stdout,
-                stderr=cpe.stderr,
+                exitcode=completed_process.returncode,
+                command=" ".join(map(str, completed_process.args)),
+                stdout=completed_process.stdout,
+                stderr=completed_process.stderr,
             )
             raise ClientFail(msg)
 
+        self.completed_process = completed_process
+
     @contextmanager
     def raises(self):
         try:
@@ -221,38 +755,10 @@ class SigstoreClient:
 
         This is an overload of `sign` for the bundle flow and should not be called directly.
         """
-        lifetime = int((self.expiry - datetime.now()).total_seconds())
-        if lifetime < 0:
-            raise RuntimeError(
-                "Signing test infrastructure failure: Test OIDC token expired "
-                f"{-lifetime} seconds ago"
-            )
-
-        args = ["sign-bundle"]
-        if self.staging:
-            args.append("--staging")
-
-        statement = getattr(materials, "statement", None)
-        if statement is not None:
-            args.append("--in-toto")
-            artifact_to_sign = statement
-        else:
-            artifact_to_sign = materials.artifact
-
-        args.extend(
-            [
-                "--identity-token",
-                self.identity_token,
-                "--bundle",
-                str(materials.bundle),
-            ]
-        )
-        if getattr(materials, "trusted_root", None) is not None:
-            args.extend(["--trusted-root", str(materials.trusted_root)])
-        if getattr(materials, "signing_config", None) is not None:
-            args.extend(["--signing-config", str(materials.signing_config)])
+        self._check_token_lifetime()
 
-        self.run(*args, str(artifact_to_sign))
+        args = self.build_sign_args(materials)
+        self.run(*args)
 
         # Set the used signing identity and issuer on verification materials:
         # This way a later verify() call will know what to expect
@@ -291,33 +797,43 @@ class SigstoreClient:
         args = self.build_verify_args(materials)
         self.run(*args)
 
-    def build_verify_args(self, materials: BundleMaterials, digest: bool = False) -> list[str]:
-        args = ["verify-bundle"]
-        if self.staging:
-            args.append("--staging")
+    def verify_batch(
+        self, materials: list[BundleMaterials], digest: bool = False
+    ) -> list[subprocess.CompletedProcess]:
+        """
+        Verify bundles with a single invocation of the optional `verify-bundles`
+        subcommand, see docs/cli_protocol.md.
 
-        args.extend(["--bundle", str(materials.bundle)])
+        Returns the result of every entry as the result of the `verify-bundle`
+        invocation that it stands for. Raises `ClientFail` if the client fails.
+        """
+        with NamedTemporaryFile(
+            mode="wt", prefix="verify-bundles-", suffix=".jsonl", delete=False
+        ) as manifest:
+            for m in materials:
+                manifest.write(json.dumps(self.build_verify_manifest_entry(m, digest)) + "\n")
 
-        if getattr(materials, "key", None) is not None:
-            args.extend(["--key", str(materials.key)])
-        else:
-            args.extend(
-                [
-                    "--certificate-identity",
-                    materials.identity,
-                    "--certificate-oidc-issuer",
-                    materials.issuer,
-                ]
+        args = ["verify-bundles"]
+        if self.staging:
+            args.append("--staging")
+        try:
+            self.run(*args, "--manifest", manifest.name)
+        finally:
+            os.unlink(manifest.name)
+        assert self.completed_process
+
+        results = [json.loads(line) for line in self.completed_process.stdout.splitlines() if line]
+        if len(results) != len(materials):
+            raise ClientFail(
+                f"verify-bundles returned {len(results)} results for {len(materials)} entries"
             )
 
-        if getattr(materials, "trusted_root", None) is not None:
-            args.extend(["--trusted-root", str(materials.trusted_root)])
-
-        if digest:
-            artifact = materials.artifact.read_bytes()
-            digest_str = f"sha256:{hashlib.sha256(artifact).hexdigest()}"
-            args.append(digest_str)
-        else:
-            args.append(str(materials.artifact))
-
-        return args
+        return [
+            subprocess.CompletedProcess(
+                [self.entrypoint, *self.build_verify_args(m, digest)],
+                result["exitcode"],
+                "",
+                result.get("stderr", ""),
+            )
+            for m, result in zip(materials, results)
+        ]
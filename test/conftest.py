@@ -1,25 +1,31 @@
+import argparse
 import enum
 import functools
+import json
 import os
 import shutil
-import subprocess
 import tempfile
 from collections.abc import Callable
-from datetime import timedelta
+from dataclasses import asdict
 from fnmatch import fnmatch
 from pathlib import Path
+from statistics import fmean
 from typing import TypeVar
-from urllib import parse
 
-import platformdirs
 import pytest
-from urllib3 import request
 
+from . import incremental, oidc, trust_material
 from .client import (
     BundleMaterials,
+    ClientTimeout,
     SigstoreClient,
     VerificationMaterials,
+    close_servers,
+    drain_invocations,
 )
+from .fixture_index import bundle_verify_cases
+from .local_services import LocalServices
+from .result_cache import VerifyResultCache, client_build_id
 
 _M = TypeVar("_M", bound=VerificationMaterials)
 _MakeMaterialsByType = Callable[[str, _M], _M]
@@ -28,17 +34,64 @@ _VerifyBundle = Callable[[VerificationMaterials], None]
 
 _XFAIL_LIST = os.getenv("GHA_SIGSTORE_CONFORMANCE_XFAIL", "").split()
 
+# Benchmark measurements per test node id, see test_benchmark.py
+_BENCHMARK_RESULTS: dict[str, dict] = {}
 
-class OidcTokenError(Exception):
-    pass
+# Load test measurements per test node id, see test_load.py
+_LOAD_RESULTS: dict[str, dict] = {}
+
+# Node ids of tests that failed because a client invocation timed out
+_TIMED_OUT_TESTS: set[str] = set()
+# Failed subtests and failed subtests that timed out per test node id, see `_timed_out()`
+_FAILED_SUBTESTS: dict[str, list[int]] = {}
+# Node ids of tests whose test function is running: reports made meanwhile are subtest
+# reports, see pytest-subtests
+_RUNNING_TESTS: set[str] = set()
+
+# Node ids of tests replayed from the verification result cache
+_CACHED_TESTS: set[str] = set()
+
+# Node ids of tests that passed or were carried forward, see `--incremental-manifest`
+_GREEN_TESTS: set[str] = set()
+_CARRIED_FORWARD_TESTS: set[str] = set()
+
+# Options that record results for a client build, see `_client_build()`
+_CLIENT_BUILD_KEYED_OPTIONS = ("--verify-result-cache", "--incremental-manifest")
+
+_CARRIED_FORWARD_REASON = "carried forward: inputs unchanged since the last green run"
 
 
 class ConfigError(Exception):
     pass
 
 
+def _shard(value: str) -> tuple[int, int]:
+    """Parse a shard specification "I/N" into (I, N)"""
+    try:
+        shard, shards = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected I/N")
+    if not 1 <= shard <= shards:
+        raise argparse.ArgumentTypeError(f"invalid shard '{value}', expected 1 <= I <= N")
+    return (shard, shards)
+
+
+def _client_timeout(value: str) -> tuple[str, float]:
+    """Parse a timeout "SECONDS" or "SUBCOMMAND=SECONDS" into (SUBCOMMAND or "*", SECONDS)"""
+    subcommand, _, seconds = value.rpartition("=")
+    try:
+        timeout = float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"invalid timeout '{value}', expected SECONDS or SUBCOMMAND=SECONDS"
+        )
+    if timeout <= 0:
+        raise argparse.ArgumentTypeError(f"invalid timeout '{value}', expected SECONDS > 0")
+    return (subcommand or "*", timeout)
+
+
 def pytest_addoption(parser) -> None:
-    """Add `--entrypoint` and `--skip-signing` flags to CLI."""
+    """Add `--entrypoint`, `--skip-signing` and other flags to CLI."""
     parser.addoption(
         "--entrypoint",
         action="store",
@@ -56,6 +109,173 @@ def pytest_addoption(parser) -> None:
         action="store_true",
         help="run tests against staging",
     )
+    parser.addoption(
+        "--workspace-mode",
+        action="store",
+        choices=["link", "copy"],
+        default="link",
+        help="populate test workspaces with symlinks to the test assets (default) or with copies",
+    )
+    parser.addoption(
+        "--identity-token",
+        action="store",
+        default="testing",
+        help=(
+            "where to get the identity token for signing tests: 'testing' (the published "
+            "testing token, default), 'local' (a locally minted token that is only accepted "
+            "by local services), 'env:NAME' or 'file:PATH'"
+        ),
+    )
+    parser.addoption(
+        "--trust-material-ttl",
+        action="store",
+        type=float,
+        default=3600.0,
+        help="seconds to reuse cached trusted roots and signing configs before a TUF refresh",
+    )
+    parser.addoption(
+        "--trust-material-dir",
+        action="store",
+        help=(
+            "use the trusted roots and signing configs in DIR/staging/ and DIR/production/ "
+            "instead of fetching them with TUF"
+        ),
+    )
+    parser.addoption(
+        "--benchmark-rounds",
+        action="store",
+        type=int,
+        default=0,
+        help="run the benchmark tests, executing each measured client invocation N times",
+    )
+    parser.addoption(
+        "--benchmark-report",
+        action="store",
+        default="benchmark-report.json",
+        help="where to write benchmark results (default benchmark-report.json)",
+    )
+    parser.addoption(
+        "--load-signatures",
+        action="store",
+        type=int,
+        default=0,
+        metavar="N",
+        help="run the signing load tests, executing N concurrent client signing invocations",
+    )
+    parser.addoption(
+        "--load-rate",
+        action="store",
+        type=float,
+        default=0.0,
+        metavar="PER_SECOND",
+        help="start load test invocations at this rate (default 0: as fast as possible)",
+    )
+    parser.addoption(
+        "--load-report",
+        action="store",
+        default="load-report.json",
+        help="where to write load test results (default load-report.json)",
+    )
+    parser.addoption(
+        "--large-artifact-size",
+        action="store",
+        type=int,
+        default=0,
+        metavar="MIB",
+        help="run the large artifact tests, signing and verifying an artifact of MIB mebibytes",
+    )
+    parser.addoption(
+        "--large-artifact-seed",
+        action="store",
+        type=int,
+        default=0,
+        help="seed of the pseudo-random contents of the large artifact (default 0)",
+    )
+    parser.addoption(
+        "--large-artifact-sparse",
+        action="store_true",
+        help="use a sparse (all zero) large artifact instead of pseudo-random contents",
+    )
+    parser.addoption(
+        "--client-concurrency",
+        action="store",
+        type=int,
+        default=0,
+        help=(
+            "maximum number of concurrent client invocations in tests that verify many bundles "
+            "(default: number of CPU cores)"
+        ),
+    )
+    parser.addoption(
+        "--cpython-release-sweep",
+        action="store_true",
+        help="verify every CPython release bundle instead of one bundle per release",
+    )
+    parser.addoption(
+        "--cpython-release-shard",
+        action="store",
+        type=_shard,
+        default=(1, 1),
+        metavar="I/N",
+        help="only verify the I:th of N deterministic shards of the CPython release bundles",
+    )
+    parser.addoption(
+        "--verify-result-cache",
+        action="store",
+        metavar="DIR",
+        help=(
+            "record verification results in DIR and replay them when the same client build "
+            "verifies the same inputs again"
+        ),
+    )
+    parser.addoption(
+        "--client-build",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help=(
+            "a file or directory of the client build, identifies the build together with the "
+            "entrypoint for --verify-result-cache and --incremental-manifest (repeatable)"
+        ),
+    )
+    parser.addoption(
+        "--incremental-manifest",
+        action="store",
+        metavar="PATH",
+        help=(
+            "only run tests whose inputs changed since the green run recorded in PATH, and "
+            "record the inputs in PATH after a green run"
+        ),
+    )
+    parser.addoption(
+        "--local-services",
+        action="store_true",
+        help=(
+            "sign against local stand-ins for the certificate authority, transparency log and "
+            "timestamp authority instead of the Sigstore instance"
+        ),
+    )
+    parser.addoption(
+        "--client-timeout",
+        action="append",
+        type=_client_timeout,
+        default=[],
+        metavar="[SUBCOMMAND=]SECONDS",
+        help=(
+            "kill client invocations (of SUBCOMMAND, or of all subcommands) that take longer "
+            "than SECONDS and report the test as timed out; can be given multiple times"
+        ),
+    )
+    parser.addoption(
+        "--verify-batch",
+        action="store_true",
+        help="also test the optional batch verification (the client implements verify-bundles)",
+    )
+    parser.addoption(
+        "--no-server-mode",
+        action="store_true",
+        help="always execute the client once per call, even if it supports server mode",
+    )
 
 
 def pytest_runtest_setup(item):
@@ -68,6 +288,234 @@ def pytest_runtest_setup(item):
 def pytest_configure(config):
     config.addinivalue_line("markers", "signing: mark test as requiring signing functionality")
     config.addinivalue_line("markers", "staging: mark test as supporting testing against staging")
+    config.addinivalue_line("markers", "benchmark: mark test as a client performance benchmark")
+    config.addinivalue_line("markers", "large_artifact: mark test as using a multi-GB artifact")
+    config.addinivalue_line("markers", "load: mark test as a client signing load test")
+    config.addinivalue_line(
+        "markers", "bundle_verify_all: mark test as using every bundle-verify fixture"
+    )
+
+    # The entrypoint is often a wrapper script that does not change when the client does:
+    # results keyed on it alone would be replayed for a different client build
+    for option in _CLIENT_BUILD_KEYED_OPTIONS:
+        if config.getoption(option) and not config.getoption("--client-build"):
+            raise pytest.UsageError(f"{option} requires --client-build")
+
+
+def _entrypoint(config) -> str:
+    """Return the absolute path of the client entrypoint"""
+    entrypoint = config.getoption("--entrypoint")
+    if not os.path.isabs(entrypoint):
+        entrypoint = os.path.join(config.invocation_params.dir, entrypoint)
+    return entrypoint
+
+
+def _client_build(config) -> str:
+    """Return the identifier of the client build, see `client_build_id()`"""
+    build_paths = tuple(
+        os.path.join(config.invocation_params.dir, path)
+        for path in config.getoption("--client-build")
+    )
+    return client_build_id(_entrypoint(config), build_paths)
+
+
+@functools.cache
+def _input_digests(config) -> dict:
+    """Return the digests of the current test inputs, see `incremental.input_digests()`"""
+    return incremental.input_digests(
+        Path(__file__).parent, _client_build(config), config.getoption("--staging")
+    )
+
+
+def _incremental_manifest_path(config) -> Path | None:
+    manifest = config.getoption("--incremental-manifest")
+    return config.invocation_params.dir / manifest if manifest else None
+
+
+def pytest_collection_modifyitems(config, items):
+    # Benchmarks, large artifact and load tests are expensive: only collect them on request
+    opt_in = {
+        "benchmark": config.getoption("--benchmark-rounds") > 0,
+        "large_artifact": config.getoption("--large-artifact-size") > 0,
+        "load": config.getoption("--load-signatures") > 0,
+    }
+    for marker, enabled in opt_in.items():
+        if enabled:
+            continue
+        deselected = [item for item in items if marker in item.keywords]
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = [item for item in items if marker not in item.keywords]
+
+    manifest_path = _incremental_manifest_path(config)
+    if manifest_path is None:
+        return
+
+    previous = incremental.load_manifest(manifest_path)
+    current = _input_digests(config)
+    for item in items:
+        callspec = getattr(item, "callspec", None)
+        bundle_verify_dir = callspec.params.get("bundle_verify_dir") if callspec else None
+        if incremental.carried_forward(
+            previous,
+            current,
+            item.nodeid,
+            Path(bundle_verify_dir).name if bundle_verify_dir else None,
+            all_bundle_verify="bundle_verify_all" in item.keywords,
+        ):
+            item.add_marker(pytest.mark.skip(reason=_CARRIED_FORWARD_REASON))
+            item.user_properties.append(("carried_forward", True))
+
+
+def pytest_runtest_logreport(report):
+    if report.when == "call" and report.passed:
+        _GREEN_TESTS.add(report.nodeid)
+
+    # Subtest reports (see pytest-subtests) only carry their own timeout mark
+    if hasattr(report, "context") and report.failed:
+        counts = _FAILED_SUBTESTS.setdefault(report.nodeid, [0, 0])
+        counts[0] += 1
+        counts[1] += ("timeout", True) in report.user_properties
+
+    if report.when != "teardown":
+        return
+
+    for name, value in report.user_properties:
+        if name == "timeout" and value:
+            _TIMED_OUT_TESTS.add(report.nodeid)
+        elif name == "benchmark":
+            _BENCHMARK_RESULTS[report.nodeid] = value
+        elif name == "load":
+            _LOAD_RESULTS[report.nodeid] = value
+        elif name == "cached" and value:
+            _CACHED_TESTS.add(report.nodeid)
+        elif name == "carried_forward" and value:
+            _CARRIED_FORWARD_TESTS.add(report.nodeid)
+            _GREEN_TESTS.add(report.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    _RUNNING_TESTS.add(item.nodeid)
+    try:
+        yield
+    finally:
+        _RUNNING_TESTS.discard(item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    timed_out = call.excinfo is not None and call.excinfo.errisinstance(ClientTimeout)
+    subtest = item.nodeid in _RUNNING_TESTS
+    # Mark the test before its report is made, so that all its reports carry the mark
+    if timed_out and not subtest:
+        item.user_properties.append(("timeout", True))
+    outcome = yield
+    # A subtest only marks its own report: the test may still pass its other subtests
+    if timed_out and subtest:
+        outcome.get_result().user_properties.append(("timeout", True))
+
+
+def _timed_out(nodeid: str) -> bool:
+    """
+    Return True if a failed test failed because a client invocation timed out: in the
+    test itself, or in every one of its failed subtests.
+    """
+    failed, timed_out = _FAILED_SUBTESTS.get(nodeid, (0, 0))
+    return nodeid in _TIMED_OUT_TESTS or 0 < failed == timed_out
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_json_modifyreport(json_report):
+    """
+    Report tests that failed because a client invocation timed out with their own
+    "timeout" outcome in the pytest-json-report report, and tests that were carried
+    forward from the last green run (see `--incremental-manifest`) with a
+    "carried_forward" outcome rather than as skipped.
+    """
+    relabeled = {"timeout": 0, "carried_forward": 0}
+    for test in json_report.get("tests", []):
+        if test["outcome"] in ("failed", "error") and _timed_out(test["nodeid"]):
+            outcome = "timeout"
+        elif test["nodeid"] in _CARRIED_FORWARD_TESTS and test["outcome"] == "skipped":
+            outcome = "carried_forward"
+        else:
+            continue
+        json_report["summary"][test["outcome"]] -= 1
+        test["outcome"] = outcome
+        relabeled[outcome] += 1
+
+    for outcome, count in relabeled.items():
+        if count:
+            json_report["summary"][outcome] = count
+
+
+def pytest_terminal_summary(terminalreporter):
+    timed_out = [
+        nodeid for nodeid in _TIMED_OUT_TESTS | _FAILED_SUBTESTS.keys() if _timed_out(nodeid)
+    ]
+    if timed_out:
+        terminalreporter.write_line(
+            f"{len(timed_out)} tests failed because a client invocation timed out"
+        )
+    if _CACHED_TESTS:
+        terminalreporter.write_line(
+            f"{len(_CACHED_TESTS)} tests replayed results from the verification result cache"
+        )
+    if _CARRIED_FORWARD_TESTS:
+        terminalreporter.write_line(
+            f"{len(_CARRIED_FORWARD_TESTS)} tests carried forward from the last green run"
+        )
+
+
+def _percentile(samples: list[float], percentile: int) -> float:
+    """Return the nearest-rank percentile of `samples`"""
+    ordered = sorted(samples)
+    rank = max(0, -(-percentile * len(ordered) // 100) - 1)
+    return ordered[rank]
+
+
+def pytest_sessionfinish(session, exitstatus):
+    # Only the xdist controller (or the single test process) writes reports and manifests
+    if hasattr(session.config, "workerinput"):
+        return
+
+    manifest_path = _incremental_manifest_path(session.config)
+    if manifest_path is not None and exitstatus == pytest.ExitCode.OK:
+        incremental.write_manifest(manifest_path, _input_digests(session.config), _GREEN_TESTS)
+
+    if _BENCHMARK_RESULTS:
+        _write_benchmark_report(session.config)
+    if _LOAD_RESULTS:
+        _write_report(session.config, "--load-report", dict(sorted(_LOAD_RESULTS.items())))
+
+
+def _write_report(config, option: str, cases: dict[str, dict]) -> None:
+    report_path = config.invocation_params.dir / config.getoption(option)
+    with open(report_path, "w") as f:
+        json.dump({"entrypoint": config.getoption("--entrypoint"), "cases": cases}, f, indent=4)
+
+
+def _write_benchmark_report(config) -> None:
+    cases = {}
+    for nodeid, result in sorted(_BENCHMARK_RESULTS.items()):
+        wall_times = result["wall_time"]
+        if not wall_times:
+            continue
+        cases[nodeid] = {
+            "rounds": len(wall_times),
+            "wall_time": {
+                "mean": fmean(wall_times),
+                "p50": _percentile(wall_times, 50),
+                "p95": _percentile(wall_times, 95),
+                "p99": _percentile(wall_times, 99),
+                "max": max(wall_times),
+            },
+            "max_rss": max(result["max_rss"]),
+            "unexpected_outcomes": result["unexpected_outcomes"],
+        }
+
+    _write_report(config, "--benchmark-report", cases)
 
 
 def pytest_internalerror(excrepr, excinfo):
@@ -79,14 +527,12 @@ def pytest_internalerror(excrepr, excinfo):
 
 
 @pytest.fixture
-@functools.cache
-def identity_token() -> str:
-    resp = request(
-        "GET",
-        "https://storage.googleapis.com/sigstore-conformance-testing-token/untrusted-testing-token.txt",
-        timeout=30.0,
-    )
-    return resp.data.decode()
+def identity_token(pytestconfig) -> str:
+    """
+    Return an identity token from the configured source. Tokens are cached across test
+    processes and refreshed before they expire.
+    """
+    return oidc.identity_token(pytestconfig.getoption("--identity-token"))
 
 
 @pytest.fixture
@@ -94,13 +540,36 @@ def client(pytestconfig, identity_token):
     """
     Parametrize each test with the client under test.
     """
-    entrypoint = pytestconfig.getoption("--entrypoint")
-    if not os.path.isabs(entrypoint):
-        entrypoint = os.path.join(pytestconfig.invocation_params.dir, entrypoint)
-
+    entrypoint = _entrypoint(pytestconfig)
     staging = pytestconfig.getoption("--staging")
+    server_mode = not pytestconfig.getoption("--no-server-mode")
+
+    result_cache = None
+    if cache_dir := pytestconfig.getoption("--verify-result-cache"):
+        result_cache = VerifyResultCache(
+            pytestconfig.invocation_params.dir / cache_dir, _client_build(pytestconfig)
+        )
+
+    timeouts = dict(pytestconfig.getoption("--client-timeout"))
 
-    return SigstoreClient(entrypoint, identity_token, staging)
+    return SigstoreClient(entrypoint, identity_token, staging, server_mode, result_cache, timeouts)
+
+
+@pytest.fixture
+def client_concurrency(pytestconfig) -> int:
+    """
+    Returns the maximum number of concurrent client invocations for tests that fan out.
+    """
+    return pytestconfig.getoption("--client-concurrency") or os.cpu_count() or 1
+
+
+@pytest.fixture(scope="session", autouse=True)
+def client_servers():
+    """
+    Shut down any clients running in server mode at the end of the session.
+    """
+    yield
+    close_servers()
 
 
 @pytest.fixture
@@ -111,18 +580,39 @@ def project_root(request) -> Path:
     return request.config.rootpath
 
 
+@pytest.fixture(scope="session")
+def local_services(pytestconfig, tmp_path_factory):
+    """
+    Run the local signing services for the session if `--local-services` is given,
+    otherwise return None.
+    """
+    if not pytestconfig.getoption("--local-services"):
+        yield None
+        return
+
+    services = LocalServices(tmp_path_factory.mktemp("local-services"))
+    yield services
+    services.close()
+
+
 @pytest.fixture
-def make_materials_by_type() -> _MakeMaterialsByType:
+def make_materials_by_type(local_services: LocalServices | None) -> _MakeMaterialsByType:
     """
     Returns a function that constructs the requested subclass of
     `VerificationMaterials` alongside an appropriate input path.
+
+    With `--local-services` the materials use the trusted root and signing config of
+    the local services.
     """
 
     def _make_materials_by_type(
         input_name: str, cls: VerificationMaterials
     ) -> VerificationMaterials:
         input_path = Path(input_name)
-        return cls.from_artifact_path(input_path)
+        materials = cls.from_artifact_path(input_path)
+        if local_services is not None and isinstance(materials, BundleMaterials):
+            materials.trusted_root, materials.signing_config = local_services.config
+        return materials
 
     return _make_materials_by_type
 
@@ -171,16 +661,30 @@ def verify_bundle(request, client) -> _VerifyBundle:
     return _verify_bundle
 
 
+def _link_assets(assets_dir: Path, workspace: Path) -> None:
+    """
+    Populate `workspace` with symlinks to the top level entries of `assets_dir`.
+
+    Assets are only ever read by the tests: anything a test (or the client under
+    test) writes goes to a new path, which lands in the workspace itself.
+    """
+    for entry in assets_dir.iterdir():
+        (workspace / entry.name).symlink_to(entry, target_is_directory=entry.is_dir())
+
+
 @pytest.fixture(autouse=True)
-def workspace(project_root: Path):
+def workspace(pytestconfig, project_root: Path):
     """
     Create a temporary workspace directory to perform the test in.
     """
     workspace = tempfile.TemporaryDirectory()
 
-    # Move entire contents of artifacts directory into workspace
+    # Make the contents of the assets directory available in the workspace
     assets_dir = project_root / "test" / "assets"
-    shutil.copytree(assets_dir, workspace.name, dirs_exist_ok=True)
+    if pytestconfig.getoption("--workspace-mode") == "copy":
+        shutil.copytree(assets_dir, workspace.name, dirs_exist_ok=True)
+    else:
+        _link_assets(assets_dir, Path(workspace.name))
 
     # Now change the current working directory to our workspace
     os.chdir(workspace.name)
@@ -189,6 +693,24 @@ def workspace(project_root: Path):
     workspace.cleanup()
 
 
+@pytest.fixture(autouse=True)
+def client_invocations(record_property):
+    """
+    Record the resource usage of all client invocations of the test as the
+    "client_invocations" property of the test.
+
+    Tests whose client invocations were all replayed from the verification result cache
+    get the "cached" property.
+    """
+    drain_invocations()
+    yield
+    invocations = drain_invocations()
+    if invocations:
+        record_property("client_invocations", [asdict(i) for i in invocations])
+        if all(i.cached for i in invocations):
+            record_property("cached", True)
+
+
 @pytest.fixture(autouse=True)
 def conformance_xfail(request):
     if any([fnmatch(request.node.name, xfail_pattern) for xfail_pattern in _XFAIL_LIST]):
@@ -200,46 +722,52 @@ def pytest_generate_tests(metafunc):
     Parametrize bundle_verify tests over all sudirectories under assets/bundle-verify
     """
     if "bundle_verify_dir" in metafunc.fixturenames:
-        asset_root = Path(__file__).parent / "assets" / "bundle-verify"
-        directories = [d for d in asset_root.iterdir() if d.is_dir()]
-        dir_paths = [str(d) for d in directories]
-        metafunc.parametrize("bundle_verify_dir", dir_paths, ids=[d.name for d in directories])
+        cases = bundle_verify_cases().values()
+        dir_paths = [case.directory for case in cases]
+        metafunc.parametrize("bundle_verify_dir", dir_paths, ids=[case.name for case in cases])
 
 
-def _client_config(project_root: Path, staging: bool) -> tuple[Path, Path]:
-    """Return paths to (up-to-date) TrustedRoot and SigningConfig
+def _client_config(pytestconfig, staging: bool) -> tuple[Path, Path]:
+    """Return paths to (recent enough) TrustedRoot and SigningConfig
 
-    This uses the internal selftest client feature 'update-trust-root'
+    Trust material is cached across test runs and processes: the TUF repository is only
+    consulted when the last successful refresh is older than `--trust-material-ttl`.
+    With `--trust-material-dir` the given snapshot is used as is.
     """
-    if staging:
-        cmd = [str(project_root / "selftest-client"), "--staging", "update-trust-root"]
-        repo = parse.quote("https://tuf-repo-cdn.sigstage.dev", safe="")
-    else:
-        cmd = [str(project_root / "selftest-client"), "update-trust-root"]
-        repo = parse.quote("https://tuf-repo-cdn.sigstore.dev", safe="")
-
-    # run the selftest client to update files in sigstore-python cache
-    subprocess.run(cmd, check=True)
-
-    # then find files in sigstore-python cache
-    cache_dir = platformdirs.user_cache_path("sigstore-python") / "tuf" / repo
-    tr = cache_dir / "trusted_root.json"
-    sc = cache_dir / "signing_config.v0.2.json"
-    assert tr.exists()
-    assert sc.exists()
+    pinned_dir = pytestconfig.getoption("--trust-material-dir")
+    if pinned_dir is not None:
+        pinned = trust_material.pinned_trust_material(Path(pinned_dir), staging)
+        if pinned is None:
+            material_dir = Path(pinned_dir) / trust_material.environment_name(staging)
+            raise ConfigError(
+                f"{material_dir} does not contain {trust_material.TRUSTED_ROOT} and "
+                f"{trust_material.SIGNING_CONFIG}"
+            )
+        return pinned
 
-    return (tr, sc)
+    ttl = pytestconfig.getoption("--trust-material-ttl")
+    return trust_material.cached_trust_material(pytestconfig.rootpath, staging, ttl)
 
 
 @pytest.fixture
 @functools.cache
-def staging_config(project_root: Path) -> tuple[Path, Path]:
-    """Return paths to (up-to-date) Staging TrustedRoot and SigningConfig"""
-    return _client_config(project_root, staging=True)
+def staging_config(pytestconfig, local_services) -> tuple[Path, Path]:
+    """Return paths to (up-to-date) Staging TrustedRoot and SigningConfig
+
+    With `--local-services` these are the trust material of the local services.
+    """
+    if local_services is not None:
+        return local_services.config
+    return _client_config(pytestconfig, staging=True)
 
 
 @pytest.fixture
 @functools.cache
-def production_config(project_root: Path) -> tuple[Path, Path]:
-    """Return paths to (up-to-date) Production TrustedRoot and SigningConfig"""
-    return _client_config(project_root, staging=False)
+def production_config(pytestconfig, local_services) -> tuple[Path, Path]:
+    """Return paths to (up-to-date) Production TrustedRoot and SigningConfig
+
+    With `--local-services` these are the trust material of the local services.
+    """
+    if local_services is not None:
+        return local_services.config
+    return _client_config(pytestconfig, staging=False)
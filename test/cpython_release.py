@@ -0,0 +1,118 @@
+"""
+Helpers for the cpython-release-tracker data used by the CPython release bundle tests.
+
+Version files are large arrays of artifact objects that embed complete Sigstore bundles.
+Rather than reading and decoding the whole file at once, `iter_release_artifacts` reads
+it in chunks and decodes one artifact at a time. The bundle of each artifact is then
+re-encoded on its own.
+"""
+
+import json
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any, NamedTuple, TextIO
+
+_CHUNK_SIZE = 64 * 1024
+
+# The characters that can follow a value in a JSON document
+_DELIMITERS = {" ", "\t", "\r", "\n", ",", ":", "]", "}"}
+
+
+class ReleaseArtifact(NamedTuple):
+    url: str
+    sha256: str
+    # The bundle, re-encoded from the decoded artifact
+    bundle: bytes
+
+
+class _JsonStream:
+    """
+    An incremental reader of a JSON document, the same as the one of the conformance
+    report generator (.github/scripts/generate_client_report.py).
+
+    Values are decoded one at a time from a buffer that only holds the current value.
+    """
+
+    def __init__(self, f: TextIO) -> None:
+        self.f = f
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size: int) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop the consumed part of the buffer
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character, "" at the end of the document"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self._fill(_CHUNK_SIZE):
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, chars: str) -> str:
+        """Consume the next non-whitespace character, which must be one of `chars`"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"expected one of {chars!r}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """Decode the next value"""
+        self.peek()
+        size = _CHUNK_SIZE
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                end = None
+            # A number may continue in the next chunk: a value is only complete if it is
+            # followed by a delimiter
+            if end is not None and (self.buffer[end : end + 1] in _DELIMITERS or self.eof):
+                self.pos = end
+                return value
+            # Grow the reads, so that a large value is decoded a bounded number of times
+            if not self._fill(size):
+                if end is not None:
+                    self.pos = end
+                    return value
+                raise ValueError("truncated JSON document")
+            size *= 2
+
+
+def _iter_array(f: TextIO) -> Iterator[Any]:
+    """
+    Yield the decoded elements of the JSON array in `f`, reading it in chunks.
+    """
+    stream = _JsonStream(f)
+    stream.expect("[")
+    if stream.peek() == "]":
+        return
+    while True:
+        yield stream.value()
+        if stream.expect(",]") == "]":
+            return
+
+
+def iter_release_artifacts(version_path: Path) -> Iterator[ReleaseArtifact]:
+    """
+    Yield the artifacts of a cpython-release-tracker version file that have a bundle,
+    with the bundle re-encoded as JSON.
+    """
+    with version_path.open(encoding="utf-8") as f:
+        for artifact in _iter_array(f):
+            bundle = artifact.get("sigstore")
+            if not bundle:
+                continue
+            yield ReleaseArtifact(artifact["url"], artifact["sha256"], json.dumps(bundle).encode())
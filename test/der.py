@@ -0,0 +1,113 @@
+"""
+A minimal DER encoder and decoder.
+
+This covers just enough of ASN.1 DER for the local timestamp authority (see
+local_services.py) to parse RFC 3161 timestamp requests and to build responses.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+SEQUENCE = 0x30
+SET = 0x31
+INTEGER = 0x02
+OCTET_STRING = 0x04
+OBJECT_IDENTIFIER = 0x06
+UTF8_STRING = 0x0C
+GENERALIZED_TIME = 0x18
+
+
+class DerError(ValueError):
+    pass
+
+
+def encode(tag: int, content: bytes) -> bytes:
+    """
+    Return the DER encoding of a single element.
+    """
+    length = len(content)
+    if length < 0x80:
+        return bytes([tag, length]) + content
+
+    length_bytes = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes([tag, 0x80 | len(length_bytes)]) + length_bytes + content
+
+
+def sequence(*elements: bytes) -> bytes:
+    return encode(SEQUENCE, b"".join(elements))
+
+
+def set_of(*elements: bytes, tag: int = SET) -> bytes:
+    # DER orders the elements of a SET OF by their encodings
+    return encode(tag, b"".join(sorted(elements)))
+
+
+def integer(value: int) -> bytes:
+    return encode(INTEGER, value.to_bytes(value.bit_length() // 8 + 1, "big", signed=True))
+
+
+def octet_string(value: bytes) -> bytes:
+    return encode(OCTET_STRING, value)
+
+
+def utf8_string(value: str) -> bytes:
+    return encode(UTF8_STRING, value.encode())
+
+
+def oid(dotted: str) -> bytes:
+    arcs = [int(arc) for arc in dotted.split(".")]
+    content = bytearray()
+    for arc in [40 * arcs[0] + arcs[1], *arcs[2:]]:
+        chunk = [arc & 0x7F]
+        while arc := arc >> 7:
+            chunk.append(0x80 | (arc & 0x7F))
+        content.extend(reversed(chunk))
+    return encode(OBJECT_IDENTIFIER, bytes(content))
+
+
+def generalized_time(value: datetime) -> bytes:
+    return encode(GENERALIZED_TIME, value.astimezone(UTC).strftime("%Y%m%d%H%M%SZ").encode())
+
+
+def explicit(number: int, element: bytes) -> bytes:
+    """
+    Return `element` with a constructed context-specific tag.
+    """
+    return encode(0xA0 | number, element)
+
+
+def decode(data: bytes) -> tuple[int, bytes, bytes]:
+    """
+    Decode the single element in `data`, returning its tag, its content and the rest
+    of `data`.
+    """
+    if len(data) < 2:
+        raise DerError("truncated element")
+
+    tag, length, offset = data[0], data[1], 2
+    if tag & 0x1F == 0x1F:
+        raise DerError("multi-byte tags are not supported")
+    if length & 0x80:
+        size = length & 0x7F
+        if size == 0 or len(data) < 2 + size:
+            raise DerError("invalid length")
+        length, offset = int.from_bytes(data[2 : 2 + size], "big"), 2 + size
+
+    end = offset + length
+    if len(data) < end:
+        raise DerError("truncated element")
+    return tag, data[offset:end], data[end:]
+
+
+def decode_elements(data: bytes) -> list[tuple[int, bytes, bytes]]:
+    """
+    Decode the concatenated elements in `data` (e.g. the content of a SEQUENCE),
+    returning the tag, content and complete encoding of each.
+    """
+    elements = []
+    while data:
+        tag, content, rest = decode(data)
+        elements.append((tag, content, data[: len(data) - len(rest)]))
+        data = rest
+    return elements
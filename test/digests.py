@@ -0,0 +1,36 @@
+"""
+Memoized file digests.
+
+Files are hashed in chunks, so memory use does not depend on the file size. Digests are
+remembered for the whole session, keyed on the path and on the size, modification time
+and inode of the file: a file that is replaced or modified is hashed again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+_DIGESTS: dict[tuple[str, int, int, int, int], str] = {}
+_LOCK = threading.Lock()
+
+
+def file_sha256(path: Path | str) -> str:
+    """
+    Return the hex SHA-256 digest of the contents of the file at `path`.
+    """
+    path = os.fspath(path)
+    with open(path, "rb") as f:
+        # Stat the opened file, so that the key describes the file that is hashed
+        stat = os.fstat(f.fileno())
+        key = (path, stat.st_size, stat.st_mtime_ns, stat.st_dev, stat.st_ino)
+        with _LOCK:
+            digest = _DIGESTS.get(key)
+        if digest is None:
+            digest = hashlib.file_digest(f, "sha256").hexdigest()
+            with _LOCK:
+                _DIGESTS[key] = digest
+
+    return digest
@@ -0,0 +1,178 @@
+"""
+An index of the bundle verification fixtures in assets/bundle-verify/.
+
+The index records the materials, expected outcome and SHA-256 digests of every fixture
+directory, so that collection and test setup do not need to probe the fixture files.
+It is cached on disk with the list of paths it was built from: the fixture directories
+and the files that `BundleMaterials.from_dir()` reads. The index is only rebuilt when the
+modification time (or size) of one of those paths changes. Adding, removing or renaming
+a file changes the modification time of its directory, so the fixture tree is not walked
+unless the index is rebuilt.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+import platformdirs
+
+from .client import BundleMaterials
+from .digests import file_sha256
+
+BUNDLE_VERIFY_ROOT = Path(__file__).parent / "assets" / "bundle-verify"
+
+# Bump when the index format changes
+_INDEX_VERSION = 2
+
+# The files of a fixture directory that `BundleMaterials.from_dir()` reads if they exist
+_MATERIAL_FILES = (
+    "bundle.sigstore.json",
+    "trusted_root.json",
+    "key.pub",
+    "issuer",
+    "identity",
+    "artifact",
+)
+
+_CACHE_DIR = platformdirs.user_cache_path("sigstore-conformance") / "fixture-index"
+
+
+@dataclass(frozen=True)
+class FixtureCase:
+    """
+    The materials of a single fixture directory, as found by `BundleMaterials.from_dir()`.
+
+    Paths are as used by the tests: the default artifact is relative to the test
+    workspace, other paths are absolute. `digests` contains the SHA-256 digests of the
+    `bundle`, `artifact`, `trusted_root` and `key` files that exist.
+    """
+
+    name: str
+    directory: str
+    bundle: str
+    artifact: str
+    trusted_root: str | None
+    key: str | None
+    identity: str
+    issuer: str
+    expect_success: bool
+    digests: dict[str, str]
+
+
+def _tracked_paths(root: Path, names: list[str]) -> list[str]:
+    """
+    Return the paths (relative to `root`) that the fixture cases `names` depend on,
+    including the default artifact.
+    """
+    tracked = [".", "a.txt"]
+    for name in names:
+        tracked.append(name)
+        tracked.extend(
+            f"{name}/{file}" for file in _MATERIAL_FILES if (root / name / file).exists()
+        )
+    return tracked
+
+
+def _fingerprint(root: Path, tracked: list[str]) -> str | None:
+    """
+    Return a digest of the names, sizes and modification times of the `tracked` paths
+    in `root`, or None if one of them does not exist anymore.
+    """
+    digest = hashlib.sha256()
+    for path in tracked:
+        try:
+            stat = os.stat(os.path.join(root, path))
+        except OSError:
+            return None
+        digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def _build_case(directory: Path) -> FixtureCase:
+    materials = BundleMaterials.from_dir(directory)
+    trusted_root = getattr(materials, "trusted_root", None)
+    key = getattr(materials, "key", None)
+
+    # The default artifact is relative to the workspace, which mirrors assets/
+    artifact = materials.artifact
+    artifact_file = artifact if artifact.is_absolute() else directory.parent.parent / artifact
+
+    digests = {"bundle": file_sha256(materials.bundle), "artifact": file_sha256(artifact_file)}
+    if trusted_root is not None:
+        digests["trusted_root"] = file_sha256(trusted_root)
+    if key is not None:
+        digests["key"] = file_sha256(key)
+
+    return FixtureCase(
+        name=directory.name,
+        directory=str(directory),
+        bundle=str(materials.bundle),
+        artifact=str(artifact),
+        trusted_root=str(trusted_root) if trusted_root is not None else None,
+        key=str(key) if key is not None else None,
+        identity=materials.identity,
+        issuer=materials.issuer,
+        expect_success=not directory.name.endswith("fail"),
+        digests=digests,
+    )
+
+
+def _write_index(index_path: Path, index: dict) -> None:
+    # Other test processes may be reading the index: only ever replace complete files
+    try:
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(mode="wt", dir=index_path.parent, delete=False) as f:
+            json.dump(index, f, indent=4)
+        os.replace(f.name, index_path)
+    except OSError:
+        pass
+
+
+def load_index(root: Path) -> dict[str, FixtureCase]:
+    """
+    Return the fixture cases in `root` by name, rebuilding the cached index if the
+    fixture tree changed.
+    """
+    root_digest = hashlib.sha256(str(root.resolve()).encode()).hexdigest()[:16]
+    index_path = _CACHE_DIR / f"{root_digest}.json"
+
+    try:
+        index = json.loads(index_path.read_text())
+        if (
+            index["version"] == _INDEX_VERSION
+            and _fingerprint(root, index["tracked"]) == index["fingerprint"]
+        ):
+            return {name: FixtureCase(**case) for name, case in index["cases"].items()}
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    # Fingerprint the tree before reading it, so that a change during the rebuild is
+    # noticed by the next session
+    names = sorted(d.name for d in root.iterdir() if d.is_dir())
+    tracked = _tracked_paths(root, names)
+    fingerprint = _fingerprint(root, tracked)
+    cases = {name: _build_case(root / name) for name in names}
+    _write_index(
+        index_path,
+        {
+            "version": _INDEX_VERSION,
+            "tracked": tracked,
+            "fingerprint": fingerprint,
+            "cases": {name: asdict(case) for name, case in cases.items()},
+        },
+    )
+    return cases
+
+
+@functools.cache
+def bundle_verify_cases() -> dict[str, FixtureCase]:
+    """
+    Return the fixture cases in assets/bundle-verify/ by name.
+    """
+    return load_index(BUNDLE_VERIFY_ROOT)
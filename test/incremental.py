@@ -0,0 +1,120 @@
+"""
+Incremental test selection.
+
+The manifest of a green run records digests of everything the tests depend on, and the
+node ids of the tests that passed. A later run carries a test forward (instead of running
+it again) if it passed in that run and none of its inputs changed since:
+
+* the client build (the contents of the entrypoint and of the `--client-build` paths) and
+  the test suite (test/, except the bundle-verify fixtures) for all tests
+* additionally the fixture directory for tests parametrized with a `bundle_verify_dir`,
+  or all fixture directories for tests marked `bundle_verify_all`
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any
+
+from .digests import file_sha256
+
+# Bump when the manifest format or the digests change
+_MANIFEST_VERSION = 2
+
+
+def _tree_digest(root: Path, files: list[Path]) -> str:
+    """
+    Return a digest of the names and contents of `files`, relative to `root`.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(files):
+        digest.update(f"{path.relative_to(root).as_posix()}\0{file_sha256(path)}\n".encode())
+    return digest.hexdigest()
+
+
+def input_digests(suite_dir: Path, client_build: str, staging: bool) -> dict[str, Any]:
+    """
+    Return the digests of the inputs of the test suite in `suite_dir`.
+    """
+    bundle_verify_root = suite_dir / "assets" / "bundle-verify"
+    fixture_dirs = sorted(d for d in bundle_verify_root.iterdir() if d.is_dir())
+
+    suite_files = [
+        path
+        for path in suite_dir.rglob("*")
+        if path.is_file()
+        and "__pycache__" not in path.parts
+        and not any(path.is_relative_to(d) for d in fixture_dirs)
+    ]
+
+    return {
+        "version": _MANIFEST_VERSION,
+        "client": client_build,
+        "staging": staging,
+        "suite": _tree_digest(suite_dir, suite_files),
+        "bundle_verify": {
+            d.name: _tree_digest(d, [path for path in d.rglob("*") if path.is_file()])
+            for d in fixture_dirs
+        },
+    }
+
+
+def load_manifest(path: Path) -> dict[str, Any] | None:
+    """
+    Return the manifest at `path`, or None if there is no usable manifest.
+    """
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get("version") != _MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(path: Path, digests: dict[str, Any], green: set[str]) -> None:
+    """
+    Record the inputs of a green run and the tests that passed in it.
+    """
+    manifest = {**digests, "green": sorted(green)}
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with NamedTemporaryFile(mode="wt", dir=path.parent, delete=False) as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(f.name, path)
+
+
+def carried_forward(
+    previous: dict[str, Any] | None,
+    current: dict[str, Any],
+    nodeid: str,
+    bundle_verify_dir: str | None,
+    all_bundle_verify: bool = False,
+) -> bool:
+    """
+    Return True if the test `nodeid` passed in the `previous` run and its inputs are
+    unchanged in the `current` run.
+    """
+    if previous is None or nodeid not in previous.get("green", []):
+        return False
+
+    for key in ("client", "staging", "suite"):
+        if previous.get(key) != current[key]:
+            return False
+
+    if all_bundle_verify and previous.get("bundle_verify") != current["bundle_verify"]:
+        return False
+
+    if bundle_verify_dir is not None:
+        digest = current["bundle_verify"].get(bundle_verify_dir)
+        return (
+            digest is not None
+            and previous.get("bundle_verify", {}).get(bundle_verify_dir) == digest
+        )
+
+    return True
@@ -0,0 +1,648 @@
+"""
+Local stand-ins for the Sigstore signing services.
+
+`LocalServices` runs a certificate authority (like Fulcio), a hashedrekord v0.0.2
+transparency log (like Rekor v2) and an RFC 3161 timestamp authority on a local HTTP
+server. It writes a trusted root and a signing config for these services, which clients
+get with `--trusted-root` and `--signing-config`: signing tests that use them do not
+depend on the network or on the latency of the public Sigstore instances.
+
+The stand-ins only implement what clients use when signing. Keys are generated when the
+services start, and the certificate authority issues certificates for the `email` claim
+of any identity token that has not expired: token signatures are not verified.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import json
+import secrets
+import struct
+import threading
+from datetime import UTC, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from cryptography import x509
+from cryptography.exceptions import InvalidSignature
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import Prehashed
+from cryptography.x509.oid import ExtendedKeyUsageOID, NameOID
+
+from . import der
+from .oidc import OidcTokenError, token_claims
+
+# Lifetime of the issued signing certificates
+_CERTIFICATE_LIFETIME = timedelta(minutes=10)
+
+# Lifetime of the generated certificate authorities, and how far they are backdated
+_CA_LIFETIME = timedelta(days=7)
+_CA_BACKDATE = timedelta(hours=1)
+
+_KEY_DETAILS = "PKIX_ECDSA_P256_SHA_256"
+
+# Fulcio certificate extensions
+_OIDC_ISSUER_V1 = x509.ObjectIdentifier("1.3.6.1.4.1.57264.1.1")
+_OIDC_ISSUER_V2 = x509.ObjectIdentifier("1.3.6.1.4.1.57264.1.8")
+_SCT_LIST = x509.ObjectIdentifier("1.3.6.1.4.1.11129.2.4.2")
+
+# RFC 3161 and CMS object identifiers
+_ID_SIGNED_DATA = "1.2.840.113549.1.7.2"
+_ID_CT_TSTINFO = "1.2.840.113549.1.9.16.1.4"
+_ID_CONTENT_TYPE = "1.2.840.113549.1.9.3"
+_ID_MESSAGE_DIGEST = "1.2.840.113549.1.9.4"
+_ID_SIGNING_CERTIFICATE_V2 = "1.2.840.113549.1.9.16.2.47"
+_ID_SHA256 = "2.16.840.1.101.3.4.2.1"
+_ID_ECDSA_WITH_SHA256 = "1.2.840.10045.4.3.2"
+_TSA_POLICY = "1.3.6.1.4.1.57264.2"
+
+
+class ServiceError(Exception):
+    """
+    A request that a local service rejects: reported to the client as HTTP 400.
+    """
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode()
+
+
+def _rfc3339(time: datetime) -> str:
+    return time.astimezone(UTC).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _spki(key: ec.EllipticCurvePublicKey) -> bytes:
+    return key.public_bytes(
+        serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+
+
+def _key_id(key: ec.EllipticCurvePublicKey) -> bytes:
+    return hashlib.sha256(_spki(key)).digest()
+
+
+def _sign(key: ec.EllipticCurvePrivateKey, data: bytes) -> bytes:
+    return key.sign(data, ec.ECDSA(hashes.SHA256()))
+
+
+def _ca_certificate(
+    key: ec.EllipticCurvePrivateKey, name: str, not_before: datetime
+) -> x509.Certificate:
+    """
+    Return a self-signed root certificate for `key`.
+    """
+    subject = x509.Name(
+        [
+            x509.NameAttribute(NameOID.ORGANIZATION_NAME, "sigstore-conformance"),
+            x509.NameAttribute(NameOID.COMMON_NAME, name),
+        ]
+    )
+    return (
+        x509.CertificateBuilder()
+        .subject_name(subject)
+        .issuer_name(subject)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(not_before)
+        .not_valid_after(not_before + _CA_LIFETIME)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .add_extension(
+            x509.KeyUsage(
+                digital_signature=False,
+                content_commitment=False,
+                key_encipherment=False,
+                data_encipherment=False,
+                key_agreement=False,
+                key_cert_sign=True,
+                crl_sign=True,
+                encipher_only=False,
+                decipher_only=False,
+            ),
+            critical=True,
+        )
+        .add_extension(x509.SubjectKeyIdentifier.from_public_key(key.public_key()), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+
+
+def _digital_signature_usage() -> x509.KeyUsage:
+    return x509.KeyUsage(
+        digital_signature=True,
+        content_commitment=False,
+        key_encipherment=False,
+        data_encipherment=False,
+        key_agreement=False,
+        key_cert_sign=False,
+        crl_sign=False,
+        encipher_only=False,
+        decipher_only=False,
+    )
+
+
+def _hash_children(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(b"\x01" + left + right).digest()
+
+
+def _split(size: int) -> int:
+    """
+    Return the largest power of two smaller than `size`.
+    """
+    return 1 << ((size - 1).bit_length() - 1)
+
+
+class MerkleLog:
+    """
+    An append-only RFC 6962 Merkle tree of entry bodies.
+
+    The hashes of complete subtrees never change: they are remembered, so that tree
+    heads and inclusion proofs only hash O(log n) nodes.
+    """
+
+    def __init__(self) -> None:
+        self._leaves: list[bytes] = []
+        self._subtrees: dict[tuple[int, int], bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._leaves)
+
+    def append(self, body: bytes) -> int:
+        """
+        Append an entry body, returning its index.
+        """
+        self._leaves.append(hashlib.sha256(b"\x00" + body).digest())
+        return len(self._leaves) - 1
+
+    def _hash(self, start: int, end: int) -> bytes:
+        size = end - start
+        if size == 1:
+            return self._leaves[start]
+
+        complete = size & (size - 1) == 0
+        if complete and (start, size) in self._subtrees:
+            return self._subtrees[(start, size)]
+
+        split = start + _split(size)
+        node = _hash_children(self._hash(start, split), self._hash(split, end))
+        if complete:
+            self._subtrees[(start, size)] = node
+        return node
+
+    def root(self, size: int) -> bytes:
+        """
+        Return the root hash of the tree of the first `size` entries.
+        """
+        return self._hash(0, size)
+
+    def inclusion_proof(self, index: int, size: int) -> list[bytes]:
+        """
+        Return the audit path of entry `index` in the tree of the first `size` entries,
+        from the leaf up.
+        """
+        path: list[bytes] = []
+        start, end = 0, size
+        while end - start > 1:
+            split = start + _split(end - start)
+            if index < split:
+                path.append(self._hash(split, end))
+                end = split
+            else:
+                path.append(self._hash(start, split))
+                start = split
+        path.reverse()
+        return path
+
+
+class LocalServices:
+    """
+    The local signing services, and the trust material for them in a directory.
+
+    The services run on a local HTTP server in a background thread until `close()`.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        now = datetime.now(UTC)
+        self.not_before = now - _CA_BACKDATE
+
+        self._ca_key = ec.generate_private_key(ec.SECP256R1())
+        self._ca_certificate = _ca_certificate(
+            self._ca_key, "sigstore-conformance local CA", self.not_before
+        )
+        self._ct_key = ec.generate_private_key(ec.SECP256R1())
+        self._log_key = ec.generate_private_key(ec.SECP256R1())
+        self._log = MerkleLog()
+        self._log_lock = threading.Lock()
+
+        self._tsa_root_key = ec.generate_private_key(ec.SECP256R1())
+        self._tsa_root = _ca_certificate(
+            self._tsa_root_key, "sigstore-conformance local TSA root", self.not_before
+        )
+        self._tsa_key = ec.generate_private_key(ec.SECP256R1())
+        self._tsa_certificate = self._tsa_leaf_certificate()
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.services = self  # type: ignore[attr-defined]
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self.origin = f"sigstore-conformance.invalid/{self._server.server_address[1]}"
+
+        self.trusted_root = directory / "trusted_root.json"
+        self.trusted_root.write_text(json.dumps(self._trusted_root(), indent=2))
+        self.signing_config = directory / "signing_config.v0.2.json"
+        self.signing_config.write_text(json.dumps(self._signing_config(), indent=2))
+
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    @property
+    def config(self) -> tuple[Path, Path]:
+        """
+        The paths to the trusted root and signing config of the services.
+        """
+        return (self.trusted_root, self.signing_config)
+
+    def _tsa_leaf_certificate(self) -> x509.Certificate:
+        return (
+            x509.CertificateBuilder()
+            .subject_name(
+                x509.Name(
+                    [
+                        x509.NameAttribute(NameOID.ORGANIZATION_NAME, "sigstore-conformance"),
+                        x509.NameAttribute(NameOID.COMMON_NAME, "sigstore-conformance local TSA"),
+                    ]
+                )
+            )
+            .issuer_name(self._tsa_root.subject)
+            .public_key(self._tsa_key.public_key())
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(self.not_before)
+            .not_valid_after(self.not_before + _CA_LIFETIME)
+            .add_extension(_digital_signature_usage(), critical=True)
+            .add_extension(
+                x509.ExtendedKeyUsage([ExtendedKeyUsageOID.TIME_STAMPING]), critical=True
+            )
+            .add_extension(
+                x509.SubjectKeyIdentifier.from_public_key(self._tsa_key.public_key()),
+                critical=False,
+            )
+            .add_extension(
+                x509.AuthorityKeyIdentifier.from_issuer_public_key(self._tsa_root_key.public_key()),
+                critical=False,
+            )
+            .sign(self._tsa_root_key, hashes.SHA256())
+        )
+
+    def _trusted_root(self) -> dict[str, Any]:
+        def public_key(key: ec.EllipticCurvePrivateKey) -> dict[str, Any]:
+            return {
+                "rawBytes": _b64(_spki(key.public_key())),
+                "keyDetails": _KEY_DETAILS,
+                "validFor": {"start": _rfc3339(self.not_before)},
+            }
+
+        def cert_chain(*certificates: x509.Certificate) -> dict[str, Any]:
+            return {
+                "certificates": [
+                    {"rawBytes": _b64(c.public_bytes(serialization.Encoding.DER))}
+                    for c in certificates
+                ]
+            }
+
+        return {
+            "mediaType": "application/vnd.dev.sigstore.trustedroot+json;version=0.1",
+            "tlogs": [
+                {
+                    "baseUrl": self.url,
+                    "hashAlgorithm": "SHA2_256",
+                    "publicKey": public_key(self._log_key),
+                    "logId": {"keyId": _b64(_key_id(self._log_key.public_key()))},
+                }
+            ],
+            "certificateAuthorities": [
+                {
+                    "subject": {"organization": "sigstore-conformance", "commonName": "local CA"},
+                    "uri": self.url,
+                    "certChain": cert_chain(self._ca_certificate),
+                    "validFor": {"start": _rfc3339(self.not_before)},
+                }
+            ],
+            "ctlogs": [
+                {
+                    "baseUrl": self.url,
+                    "hashAlgorithm": "SHA2_256",
+                    "publicKey": public_key(self._ct_key),
+                    "logId": {"keyId": _b64(_key_id(self._ct_key.public_key()))},
+                }
+            ],
+            "timestampAuthorities": [
+                {
+                    "subject": {"organization": "sigstore-conformance", "commonName": "local TSA"},
+                    "uri": f"{self.url}/api/v1/timestamp",
+                    "certChain": cert_chain(self._tsa_certificate, self._tsa_root),
+                    "validFor": {"start": _rfc3339(self.not_before)},
+                }
+            ],
+        }
+
+    def _signing_config(self) -> dict[str, Any]:
+        def service(url: str, major_api_version: int) -> dict[str, Any]:
+            return {
+                "url": url,
+                "majorApiVersion": major_api_version,
+                "validFor": {"start": _rfc3339(self.not_before)},
+                "operator": "sigstore-conformance",
+            }
+
+        return {
+            "mediaType": "application/vnd.dev.sigstore.signingconfig.v0.2+json",
+            "caUrls": [service(self.url, 1)],
+            "oidcUrls": [],
+            "rekorTlogUrls": [service(self.url, 2)],
+            "tsaUrls": [service(f"{self.url}/api/v1/timestamp", 1)],
+            "rekorTlogConfig": {"selector": "ANY"},
+            "tsaConfig": {"selector": "ANY"},
+        }
+
+    def _sct_extension(self, precertificate: x509.Certificate, timestamp: datetime) -> bytes:
+        """
+        Return the DER encoded SCT list extension value for a precertificate.
+        """
+        issuer_key_id = _key_id(self._ca_key.public_key())
+        tbs = precertificate.tbs_certificate_bytes
+        millis = int(timestamp.timestamp() * 1000)
+
+        # The "digitally-signed" struct of RFC 6962, section 3.2, for a precert entry
+        signed = (
+            struct.pack("!BBQH", 0, 0, millis, 1)
+            + issuer_key_id
+            + len(tbs).to_bytes(3, "big")
+            + tbs
+            + struct.pack("!H", 0)
+        )
+        signature = _sign(self._ct_key, signed)
+
+        sct = (
+            b"\x00"
+            + _key_id(self._ct_key.public_key())
+            + struct.pack("!QH", millis, 0)
+            + struct.pack("!BBH", 4, 3, len(signature))
+            + signature
+        )
+        sct_list = struct.pack("!HH", len(sct) + 2, len(sct)) + sct
+        return der.octet_string(sct_list)
+
+    def sign_certificate(self, token: str, csr_pem: bytes) -> list[str]:
+        """
+        Issue a signing certificate for the identity in `token` and the key in the
+        certificate signing request, returning the PEM encoded chain.
+        """
+        try:
+            claims = token_claims(token)
+            identity, issuer, expiry = claims["email"], claims["iss"], claims["exp"]
+        except (OidcTokenError, KeyError) as e:
+            raise ServiceError(f"invalid identity token: {e}")
+
+        now = datetime.now(UTC)
+        if not isinstance(expiry, int | float) or expiry < now.timestamp():
+            raise ServiceError("identity token has expired")
+
+        try:
+            csr = x509.load_pem_x509_csr(csr_pem)
+        except ValueError as e:
+            raise ServiceError(f"invalid certificate signing request: {e}")
+        if not csr.is_signature_valid:
+            raise ServiceError("invalid certificate signing request signature")
+        public_key = csr.public_key()
+        if not isinstance(public_key, ec.EllipticCurvePublicKey):
+            raise ServiceError("only ECDSA keys are supported")
+
+        builder = (
+            x509.CertificateBuilder()
+            .subject_name(x509.Name([]))
+            .issuer_name(self._ca_certificate.subject)
+            .public_key(public_key)
+            .serial_number(x509.random_serial_number())
+            .not_valid_before(now)
+            .not_valid_after(now + _CERTIFICATE_LIFETIME)
+            .add_extension(_digital_signature_usage(), critical=True)
+            .add_extension(
+                x509.ExtendedKeyUsage([ExtendedKeyUsageOID.CODE_SIGNING]), critical=False
+            )
+            .add_extension(x509.SubjectKeyIdentifier.from_public_key(public_key), critical=False)
+            .add_extension(
+                x509.AuthorityKeyIdentifier.from_issuer_public_key(self._ca_key.public_key()),
+                critical=False,
+            )
+            .add_extension(x509.SubjectAlternativeName([x509.RFC822Name(identity)]), critical=True)
+            .add_extension(
+                x509.UnrecognizedExtension(_OIDC_ISSUER_V1, issuer.encode()), critical=False
+            )
+            .add_extension(
+                x509.UnrecognizedExtension(_OIDC_ISSUER_V2, der.utf8_string(issuer)), critical=False
+            )
+        )
+        precertificate = builder.sign(self._ca_key, hashes.SHA256())
+        certificate = builder.add_extension(
+            x509.UnrecognizedExtension(_SCT_LIST, self._sct_extension(precertificate, now)),
+            critical=False,
+        ).sign(self._ca_key, hashes.SHA256())
+
+        return [
+            c.public_bytes(serialization.Encoding.PEM).decode()
+            for c in (certificate, self._ca_certificate)
+        ]
+
+    def _checkpoint(self, size: int, root: bytes) -> str:
+        """
+        Return a signed checkpoint (a signed note) for the tree head.
+        """
+        note = f"{self.origin}\n{size}\n{_b64(root)}\n"
+        key_id = _key_id(self._log_key.public_key())
+        signature = _b64(key_id[:4] + _sign(self._log_key, note.encode()))
+        return f"{note}\n— {self.origin} {signature}\n"
+
+    def create_entry(self, request: dict[str, Any]) -> dict[str, Any]:
+        """
+        Add a hashedrekord v0.0.2 entry to the log, returning the transparency log
+        entry with an inclusion proof.
+        """
+        try:
+            hashed_rekord = request["hashedRekordRequestV002"]
+            digest = base64.b64decode(hashed_rekord["digest"])
+            signature = hashed_rekord["signature"]
+            content = base64.b64decode(signature["content"])
+            verifier = signature["verifier"]
+            certificate = x509.load_der_x509_certificate(
+                base64.b64decode(verifier["x509Certificate"]["rawBytes"])
+            )
+            key_details = verifier["keyDetails"]
+        except (KeyError, TypeError, ValueError) as e:
+            raise ServiceError(f"invalid hashedrekord request: {e}")
+
+        public_key = certificate.public_key()
+        if key_details != _KEY_DETAILS or not isinstance(public_key, ec.EllipticCurvePublicKey):
+            raise ServiceError(f"unsupported key details {key_details}")
+        try:
+            public_key.verify(content, digest, ec.ECDSA(Prehashed(hashes.SHA256())))
+        except InvalidSignature:
+            raise ServiceError("signature does not match the digest")
+
+        body = json.dumps(
+            {
+                "kind": "hashedrekord",
+                "apiVersion": "0.0.2",
+                "spec": {
+                    "hashedRekordV002": {
+                        "data": {"algorithm": "SHA2_256", "digest": _b64(digest)},
+                        "signature": {"content": _b64(content), "verifier": verifier},
+                    }
+                },
+            },
+            separators=(",", ":"),
+        ).encode()
+
+        with self._log_lock:
+            index = self._log.append(body)
+            size = len(self._log)
+            root = self._log.root(size)
+            hashes_ = self._log.inclusion_proof(index, size)
+
+        return {
+            "logIndex": str(index),
+            "logId": {"keyId": _b64(_key_id(self._log_key.public_key()))},
+            "kindVersion": {"kind": "hashedrekord", "version": "0.0.2"},
+            "integratedTime": "0",
+            "inclusionProof": {
+                "logIndex": str(index),
+                "rootHash": _b64(root),
+                "treeSize": str(size),
+                "hashes": [_b64(h) for h in hashes_],
+                "checkpoint": {"envelope": self._checkpoint(size, root)},
+            },
+            "canonicalizedBody": _b64(body),
+        }
+
+    def timestamp(self, request: bytes) -> bytes:
+        """
+        Return the DER encoded RFC 3161 TimeStampResp for a TimeStampReq.
+        """
+        try:
+            tag, content, rest = der.decode(request)
+            if tag != der.SEQUENCE or rest:
+                raise der.DerError("TimeStampReq is not a SEQUENCE")
+            _, message_imprint, *optional = der.decode_elements(content)
+        except (der.DerError, ValueError) as e:
+            raise ServiceError(f"invalid timestamp request: {e}")
+
+        nonce = None
+        for tag, value, _ in optional:
+            if tag == der.INTEGER:
+                nonce = int.from_bytes(value, "big", signed=True)
+
+        now = datetime.now(UTC)
+        tst_info = der.sequence(
+            der.integer(1),
+            der.oid(_TSA_POLICY),
+            message_imprint[2],
+            der.integer(secrets.randbits(64)),
+            der.generalized_time(now),
+            *([der.integer(nonce)] if nonce is not None else []),
+        )
+
+        sha256 = der.sequence(der.oid(_ID_SHA256))
+        tsa_certificate = self._tsa_certificate.public_bytes(serialization.Encoding.DER)
+        signed_attributes = [
+            der.sequence(der.oid(_ID_CONTENT_TYPE), der.set_of(der.oid(_ID_CT_TSTINFO))),
+            der.sequence(
+                der.oid(_ID_MESSAGE_DIGEST),
+                der.set_of(der.octet_string(hashlib.sha256(tst_info).digest())),
+            ),
+            der.sequence(
+                der.oid(_ID_SIGNING_CERTIFICATE_V2),
+                der.set_of(
+                    der.sequence(
+                        der.sequence(
+                            der.sequence(der.octet_string(hashlib.sha256(tsa_certificate).digest()))
+                        )
+                    )
+                ),
+            ),
+        ]
+
+        # The signature covers the DER encoding of the attributes as a SET OF
+        signature = _sign(self._tsa_key, der.set_of(*signed_attributes))
+        signer_info = der.sequence(
+            der.integer(1),
+            der.sequence(
+                self._tsa_root.subject.public_bytes(),
+                der.integer(self._tsa_certificate.serial_number),
+            ),
+            sha256,
+            der.set_of(*signed_attributes, tag=0xA0),
+            der.sequence(der.oid(_ID_ECDSA_WITH_SHA256)),
+            der.octet_string(signature),
+        )
+        signed_data = der.sequence(
+            der.integer(3),
+            der.set_of(sha256),
+            der.sequence(der.oid(_ID_CT_TSTINFO), der.explicit(0, der.octet_string(tst_info))),
+            der.explicit(0, tsa_certificate),
+            der.set_of(signer_info),
+        )
+
+        return der.sequence(
+            der.sequence(der.integer(0)),
+            der.sequence(der.oid(_ID_SIGNED_DATA), der.explicit(0, signed_data)),
+        )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:
+        services: LocalServices = self.server.services  # type: ignore[attr-defined]
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        try:
+            if self.path == "/api/v2/signingCert":
+                authorization = self.headers.get("Authorization", "")
+                if not authorization.startswith("Bearer "):
+                    raise ServiceError("missing identity token")
+                try:
+                    csr = base64.b64decode(json.loads(body)["certificateSigningRequest"])
+                except (KeyError, TypeError, ValueError) as e:
+                    raise ServiceError(f"invalid signing certificate request: {e}")
+                chain = services.sign_certificate(authorization[len("Bearer ") :], csr)
+                response = {"signedCertificateEmbeddedSct": {"chain": {"certificates": chain}}}
+                self._respond(200, "application/json", json.dumps(response).encode())
+            elif self.path == "/api/v2/log/entries":
+                try:
+                    request = json.loads(body)
+                except ValueError as e:
+                    raise ServiceError(f"invalid log entry request: {e}")
+                entry = services.create_entry(request)
+                self._respond(200, "application/json", json.dumps(entry).encode())
+            elif self.path == "/api/v1/timestamp":
+                self._respond(200, "application/timestamp-reply", services.timestamp(body))
+            else:
+                self._respond(404, "text/plain", b"not found")
+        except ServiceError as e:
+            self._respond(400, "application/json", json.dumps({"message": str(e)}).encode())
+
+    def _respond(self, status: int, content_type: str, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Requests are not interesting in test output
+        pass
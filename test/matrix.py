@@ -0,0 +1,190 @@
+"""
+Run the test suite for several clients side by side.
+
+The preparation that all clients share (trust material, identity token) is done once,
+then the suite runs for every client concurrently, each in its own pytest process and
+working directory. Every client gets its own pytest-json-report report, and the
+outcomes of all clients are compared in a cross-client diff.
+
+Clients may have expected failures of their own, in addition to the shared ones in
+`GHA_SIGSTORE_CONFORMANCE_XFAIL`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import oidc, trust_material
+
+_CLIENT_NAME = re.compile(r"^[A-Za-z0-9._-]+$")
+
+_XFAIL_ENV = "GHA_SIGSTORE_CONFORMANCE_XFAIL"
+
+
+@dataclass
+class MatrixClient:
+    name: str
+    entrypoint: str
+    # Expected failure patterns of this client only
+    xfail: list[str] = field(default_factory=list)
+
+
+def parse_clients(spec: str, xfail_spec: str = "") -> list[MatrixClient]:
+    """
+    Parse whitespace-separated clients, each "NAME=ENTRYPOINT" or just "ENTRYPOINT"
+    (named after the entrypoint file).
+
+    `xfail_spec` holds the expected failures of clients, one line per client:
+    "NAME: PATTERN [PATTERN ...]".
+    """
+    clients: list[MatrixClient] = []
+    for item in spec.split():
+        name, sep, entrypoint = item.partition("=")
+        if not sep:
+            name, entrypoint = Path(item).name, item
+        # Like `--entrypoint`, relative to the current directory, not to the working
+        # directory of the client run
+        entrypoint = os.path.abspath(entrypoint)
+
+        if not _CLIENT_NAME.match(name):
+            raise ValueError(f"invalid client name '{name}', expected [A-Za-z0-9._-]+")
+        if any(client.name == name for client in clients):
+            raise ValueError(f"duplicate client name '{name}'")
+        clients.append(MatrixClient(name, entrypoint))
+
+    by_name = {client.name: client for client in clients}
+    for line in xfail_spec.splitlines():
+        if not line.strip():
+            continue
+        name, sep, patterns = line.partition(":")
+        client = by_name.get(name.strip())
+        if not sep or client is None:
+            raise ValueError(f"invalid client xfail '{line}', expected 'NAME: PATTERN ...'")
+        client.xfail.extend(patterns.split())
+
+    return clients
+
+
+def report_path(directory: Path, client: MatrixClient) -> Path:
+    return directory / "reports" / f"{client.name}.json"
+
+
+def prepare(
+    directory: Path,
+    project_root: Path,
+    staging: bool,
+    signing: bool,
+    local_services: bool,
+    trust_material_ttl: float = 3600.0,
+) -> list[str]:
+    """
+    Do the preparation that the test runs of all clients share, returning the pytest
+    arguments that make a test run use it.
+
+    All clients sign with the identity token that is fetched here into the token cache,
+    and verify their signatures against one snapshot of the trust material, taken here.
+    Without signing (or with local services) neither is needed.
+    """
+    args = []
+    if signing and not local_services:
+        snapshot_dir = directory / "trust-material"
+        trust_material.snapshot_trust_material(
+            project_root, staging, trust_material_ttl, snapshot_dir
+        )
+        args.append(f"--trust-material-dir={snapshot_dir}")
+
+    if signing:
+        source = "local" if local_services else "testing"
+        oidc.identity_token(source)
+        args.append(f"--identity-token={source}")
+
+    return args
+
+
+def run(clients: list[MatrixClient], pytest_args: list[str], directory: Path) -> dict[str, int]:
+    """
+    Run pytest with `pytest_args` for all clients concurrently, returning the exit
+    status of each client run.
+
+    Each run has its own working directory under `directory`, which also holds its
+    output (pytest.log) and any other reports it writes.
+    """
+    (directory / "reports").mkdir(parents=True, exist_ok=True)
+
+    processes = {}
+    for client in clients:
+        env = dict(os.environ)
+        env[_XFAIL_ENV] = " ".join([*env.get(_XFAIL_ENV, "").split(), *client.xfail])
+
+        workdir = directory / client.name
+        workdir.mkdir(parents=True, exist_ok=True)
+        with (workdir / "pytest.log").open("w") as log:
+            processes[client.name] = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "pytest",
+                    *pytest_args,
+                    f"--entrypoint={client.entrypoint}",
+                    "--json-report",
+                    f"--json-report-file={report_path(directory, client)}",
+                ],
+                cwd=workdir,
+                env=env,
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+            )
+
+    return {name: process.wait() for name, process in processes.items()}
+
+
+def _outcomes(report: Path) -> dict[str, str]:
+    try:
+        with report.open() as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {test["nodeid"]: test["outcome"] for test in data.get("tests", [])}
+
+
+def diff(clients: list[MatrixClient], directory: Path) -> dict:
+    """
+    Compare the test outcomes of all clients, returning the tests whose outcome is not
+    the same for all clients. Tests that did not run for a client have the outcome
+    "missing" for that client.
+    """
+    outcomes = {client.name: _outcomes(report_path(directory, client)) for client in clients}
+    nodeids = sorted(set().union(*outcomes.values()))
+
+    differences = {}
+    for nodeid in nodeids:
+        by_client = {name: tests.get(nodeid, "missing") for name, tests in outcomes.items()}
+        if len(set(by_client.values())) > 1:
+            differences[nodeid] = by_client
+
+    return {"clients": [client.name for client in clients], "differences": differences}
+
+
+def diff_markdown(matrix_diff: dict) -> str:
+    """
+    Render a cross-client diff as a Markdown table.
+    """
+    clients = matrix_diff["clients"]
+    differences = matrix_diff["differences"]
+    if not differences:
+        return f"All tests have the same outcome for {', '.join(clients)}"
+
+    lines = [
+        f"| Test | {' | '.join(clients)} |",
+        f"|---|{'---|' * len(clients)}",
+    ]
+    for nodeid, by_client in differences.items():
+        lines.append(f"| `{nodeid}` | {' | '.join(by_client[name] for name in clients)} |")
+    return "\n".join(lines)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from base64 import b64decode, urlsafe_b64encode
+from collections.abc import Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+from typing import Any
+
+import platformdirs
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+from urllib3 import request
+
+TESTING_TOKEN_URL = (
+    "https://storage.googleapis.com/sigstore-conformance-testing-token/untrusted-testing-token.txt"
+)
+
+# Identity and issuer of locally minted tokens
+LOCAL_TOKEN_IDENTITY = "conformance@sigstore-conformance.invalid"
+LOCAL_TOKEN_ISSUER = "https://oidc.sigstore-conformance.invalid"
+_LOCAL_TOKEN_LIFETIME = timedelta(hours=1)
+
+# Cached tokens are refreshed when they have less than this much lifetime left
+_REFRESH_MARGIN = timedelta(minutes=10)
+
+_CACHE_DIR = platformdirs.user_cache_path("sigstore-conformance") / "identity-token"
+
+# In-memory cache of tokens per source
+_TOKENS: dict[str, str] = {}
+
+
+class OidcTokenError(Exception):
+    pass
+
+
+def token_claims(token: str) -> dict[str, Any]:
+    """
+    Return the (unverified) claims of a JWT.
+    """
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (4 - len(payload) % 4)
+        claims = json.loads(b64decode(payload, altchars=b"-_"))
+    except (IndexError, ValueError) as e:
+        raise OidcTokenError("Test suite failed to parse OIDC token") from e
+
+    if not isinstance(claims, dict):
+        raise OidcTokenError("Test suite failed to parse OIDC token")
+
+    return claims
+
+
+def token_expiry(token: str) -> datetime:
+    try:
+        return datetime.fromtimestamp(token_claims(token)["exp"])
+    except (KeyError, TypeError, ValueError) as e:
+        raise OidcTokenError("OIDC token has no valid 'exp' claim") from e
+
+
+def _is_fresh(token: str) -> bool:
+    try:
+        return token_expiry(token) - datetime.now() > _REFRESH_MARGIN
+    except OidcTokenError:
+        return False
+
+
+def _fetch_testing_token() -> str:
+    resp = request("GET", TESTING_TOKEN_URL, timeout=30.0)
+    if resp.status != 200:
+        raise OidcTokenError(f"Failed to fetch testing token: HTTP {resp.status}")
+    return resp.data.decode().strip()
+
+
+def _b64url(data: bytes) -> str:
+    return urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def mint_local_token() -> str:
+    """
+    Mint an identity token signed by a throwaway key.
+
+    The token is not trusted by any real Sigstore instance: it is meant for offline runs
+    and for signing against local stand-in services.
+    """
+    now = int(time.time())
+    header = {"alg": "ES256", "typ": "JWT"}
+    claims = {
+        "iss": LOCAL_TOKEN_ISSUER,
+        "sub": LOCAL_TOKEN_IDENTITY,
+        "email": LOCAL_TOKEN_IDENTITY,
+        "email_verified": True,
+        "aud": "sigstore",
+        "iat": now,
+        "nbf": now,
+        "exp": now + int(_LOCAL_TOKEN_LIFETIME.total_seconds()),
+    }
+    signing_input = f"{_b64url(json.dumps(header).encode())}.{_b64url(json.dumps(claims).encode())}"
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    r, s = decode_dss_signature(key.sign(signing_input.encode(), ec.ECDSA(hashes.SHA256())))
+    signature = r.to_bytes(32, "big") + s.to_bytes(32, "big")
+
+    return f"{signing_input}.{_b64url(signature)}"
+
+
+def _cached_token(name: str, fetch: Callable[[], str]) -> str:
+    """
+    Return a token from the on-disk cache shared by all test processes, refreshing it
+    with `fetch` when it is missing or about to expire.
+    """
+    cache_path = _CACHE_DIR / name
+    try:
+        token = cache_path.read_text()
+        if _is_fresh(token):
+            return token
+    except OSError:
+        pass
+
+    token = fetch()
+    token_expiry(token)
+
+    # Other test processes may be reading the cache: only ever replace complete files
+    try:
+        _CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with NamedTemporaryFile(mode="wt", dir=_CACHE_DIR, delete=False) as f:
+            f.write(token)
+        os.replace(f.name, cache_path)
+    except OSError:
+        pass
+
+    return token
+
+
+def identity_token(source: str) -> str:
+    """
+    Return an identity token from the given source:
+
+    * `testing`: the published sigstore-conformance testing token
+    * `local`: a locally minted token, see `mint_local_token()`
+    * `env:NAME`: the token in environment variable NAME
+    * `file:PATH`: the token in file PATH
+
+    Tokens from the `testing` and `local` sources are cached on disk and refreshed
+    before they expire.
+    """
+    token = _TOKENS.get(source)
+    if token is not None and _is_fresh(token):
+        return token
+
+    if source == "testing":
+        token = _cached_token("testing", _fetch_testing_token)
+    elif source == "local":
+        token = _cached_token("local", mint_local_token)
+    elif source.startswith("env:"):
+        name = source[len("env:") :]
+        if name not in os.environ:
+            raise OidcTokenError(f"Environment variable {name} is not set")
+        token = os.environ[name].strip()
+    elif source.startswith("file:"):
+        token = Path(source[len("file:") :]).read_text().strip()
+    else:
+        raise OidcTokenError(f"Unknown identity token source '{source}'")
+
+    _TOKENS[source] = token
+    return token
@@ -0,0 +1,120 @@
+"""
+An opt-in cache of client verification results.
+
+Results are keyed on the client build and on the exact verification request: the
+`verify-bundle` arguments, with every file argument replaced by the digest of its
+contents. A cached result is only replayed for a byte-identical bundle, artifact,
+trusted root and key verified by the same client build.
+
+Failed verifications are only recorded if they are verified against a given trusted root:
+otherwise they may depend on the trust root the client fetches, or on the network.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import json
+import os
+import subprocess
+from pathlib import Path
+from tempfile import NamedTemporaryFile
+
+from .digests import file_sha256
+
+# Bump when the cache key or entry format changes
+_CACHE_VERSION = 2
+
+
+@functools.cache
+def client_build_id(entrypoint: str, build_paths: tuple[str, ...] = ()) -> str:
+    """
+    Return an identifier of the client build under test: a digest of the contents of the
+    entrypoint and of the given build artifacts (files, or directories of files).
+
+    The entrypoint alone does not identify the client if it is only a wrapper script:
+    the client binary or package it runs must then be given as a build artifact.
+    """
+    digest = hashlib.sha256()
+    for path in map(Path, (entrypoint, *build_paths)):
+        files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for file in files:
+            digest.update(f"{file.relative_to(path).as_posix()}\0{file_sha256(file)}\n".encode())
+        digest.update(b"\n")
+
+    return f"build:{digest.hexdigest()}"
+
+
+class VerifyResultCache:
+    """
+    Verification results stored as one JSON file per cache key in a directory.
+    """
+
+    def __init__(self, cache_dir: Path, client_build: str) -> None:
+        """
+        Create a cache in `cache_dir` for the client build identified by `client_build`
+        (see `client_build_id()`).
+        """
+        self.cache_dir = cache_dir
+        self.client_build = client_build
+
+    def key(self, args: list[str]) -> str:
+        """
+        Return the cache key of a client invocation with the given arguments.
+        """
+        request: list[str | dict[str, str]] = []
+        for arg in args:
+            path = Path(arg)
+            # Paths are relative to the test workspace: only their contents matter
+            if not arg.startswith("-") and path.is_file():
+                request.append({"file": file_sha256(path)})
+            else:
+                request.append(arg)
+
+        material = json.dumps(
+            {
+                "version": _CACHE_VERSION,
+                "client": self.client_build,
+                "request": request,
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode()).hexdigest()
+
+    def get(self, key: str, full_command: list[str]) -> subprocess.CompletedProcess | None:
+        """
+        Return the recorded result for `key`, if there is one.
+        """
+        try:
+            entry = json.loads((self.cache_dir / f"{key}.json").read_text())
+            return subprocess.CompletedProcess(
+                full_command, entry["exitcode"], entry["stdout"], entry["stderr"]
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(
+        self, key: str, args: list[str], completed_process: subprocess.CompletedProcess
+    ) -> None:
+        """
+        Record the result of a client invocation with the given arguments.
+
+        Failures are not recorded if the client verified against its own trust root.
+        """
+        if completed_process.returncode != 0 and "--trusted-root" not in args:
+            return
+
+        entry = {
+            "exitcode": completed_process.returncode,
+            "stdout": completed_process.stdout,
+            "stderr": completed_process.stderr,
+        }
+
+        # Other test processes may be reading the cache: only ever replace complete files
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            with NamedTemporaryFile(mode="wt", dir=self.cache_dir, delete=False) as f:
+                json.dump(entry, f)
+            os.replace(f.name, self.cache_dir / f"{key}.json")
+        except OSError:
+            pass
@@ -0,0 +1,99 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest  # type: ignore
+
+from test.client import BundleMaterials, SigstoreClient, run_measured
+from test.conftest import ArtifactInputType, _MakeMaterialsByType
+from test.fixture_index import bundle_verify_cases
+
+# These tests are only collected with `--benchmark-rounds`: see conftest.py
+pytestmark = pytest.mark.benchmark
+
+
+def _benchmark(
+    pytestconfig, record_property, command: Callable[[], list[str]], expect_success: bool
+) -> None:
+    """
+    Run the client command returned by `command` once per benchmark round and record
+    the measurements as the "benchmark" property of the test.
+    """
+    wall_times: list[float] = []
+    max_rss: list[int] = []
+    unexpected_outcomes = 0
+
+    for _ in range(pytestconfig.getoption("--benchmark-rounds")):
+        # Always measure separate client processes, even if the client supports server mode
+        _, invocation = run_measured(command())
+        wall_times.append(invocation.wall_time)
+        max_rss.append(invocation.max_rss or 0)
+        if (invocation.exitcode == 0) != expect_success:
+            unexpected_outcomes += 1
+
+    record_property(
+        "benchmark",
+        {"wall_time": wall_times, "max_rss": max_rss, "unexpected_outcomes": unexpected_outcomes},
+    )
+
+
+def test_benchmark_startup(pytestconfig, record_property, client: SigstoreClient) -> None:
+    """
+    Measure the process spawn and startup overhead of the client with an invocation that
+    fails argument parsing.
+    """
+    _benchmark(
+        pytestconfig,
+        record_property,
+        lambda: [client.entrypoint, "verify-bundle"],
+        expect_success=False,
+    )
+
+
+@pytest.mark.parametrize("input_type", [ArtifactInputType.PATH, ArtifactInputType.DIGEST], ids=str)
+def test_benchmark_verify(
+    pytestconfig,
+    record_property,
+    client: SigstoreClient,
+    bundle_verify_dir,
+    input_type: ArtifactInputType,
+) -> None:
+    """
+    Measure verification of the bundles in assets/bundle-verify/*.
+    """
+    case = bundle_verify_cases()[Path(bundle_verify_dir).name]
+    materials = BundleMaterials.from_case(case)
+    args = client.build_verify_args(materials, digest=input_type == ArtifactInputType.DIGEST)
+
+    _benchmark(
+        pytestconfig,
+        record_property,
+        lambda: [client.entrypoint, *args],
+        expect_success=case.expect_success,
+    )
+
+
+@pytest.mark.signing
+@pytest.mark.staging
+@pytest.mark.parametrize("input_name", ["a.txt", "statement.json"])
+def test_benchmark_sign(
+    pytestconfig,
+    record_property,
+    client: SigstoreClient,
+    make_materials_by_type: _MakeMaterialsByType,
+    input_name: str,
+) -> None:
+    """
+    Measure signing of an artifact and of an in-toto statement.
+    """
+    materials: BundleMaterials
+    materials = make_materials_by_type(input_name, BundleMaterials)
+    if input_name == "statement.json":
+        materials.statement = materials.artifact
+        materials.artifact = Path("a.txt")
+
+    def _command() -> list[str]:
+        # Every round produces a new bundle
+        materials.bundle.unlink(missing_ok=True)
+        return [client.entrypoint, *client.build_sign_args(materials)]
+
+    _benchmark(pytestconfig, record_property, _command, expect_success=True)
@@ -1,6 +1,9 @@
+import asyncio
+import hashlib
 import json
 import os
 import tempfile
+from collections.abc import Coroutine
 from pathlib import Path
 from typing import Any
 
@@ -9,8 +12,11 @@ from cryptography import x509
 from sigstore_protobuf_specs.dev.sigstore.bundle.v1 import Bundle
 from sigstore_protobuf_specs.dev.sigstore.rekor.v1 import KindVersion
 
+from test.async_client import AsyncSigstoreClient
 from test.client import BundleMaterials, ClientFail, SigstoreClient
-from test.conftest import _MakeMaterialsByType, _VerifyBundle
+from test.conftest import ArtifactInputType, _MakeMaterialsByType, _VerifyBundle
+from test.cpython_release import iter_release_artifacts
+from test.fixture_index import bundle_verify_cases
 
 SKIP_CPYTHON_RELEASE_TESTS = (
     os.getenv("GHA_SIGSTORE_CONFORMANCE_SKIP_CPYTHON_RELEASE_TESTS", "false") != "false"
@@ -27,16 +33,50 @@ def test_verify(
     """
     Test all bundles in assets/bundle-verify/*. See assets/bundle-verify/README
     """
-    path = Path(bundle_verify_dir)
-    materials = BundleMaterials.from_dir(path)
+    case = bundle_verify_cases()[Path(bundle_verify_dir).name]
+    materials = BundleMaterials.from_case(case)
 
-    if path.name.endswith("fail"):
+    if not case.expect_success:
         with client.raises():
             verify_bundle(materials)
     else:
         verify_bundle(materials)
 
 
+@pytest.mark.bundle_verify_all
+@pytest.mark.parametrize("input_type", [ArtifactInputType.PATH, ArtifactInputType.DIGEST], ids=str)
+def test_verify_batch(
+    pytestconfig, client: SigstoreClient, subtests, input_type: ArtifactInputType
+) -> None:
+    """
+    Check that verifying all bundles in assets/bundle-verify/* with the optional
+    `verify-bundles` subcommand has the same results as verifying them one at a time.
+
+    Only runs with `--verify-batch`, for clients that implement `verify-bundles`.
+    """
+    if not pytestconfig.getoption("--verify-batch"):
+        pytest.skip("batch verification not enabled (--verify-batch)")
+
+    cases = list(bundle_verify_cases().values())
+    materials = [BundleMaterials.from_case(case) for case in cases]
+    digest = input_type == ArtifactInputType.DIGEST
+
+    results = client.verify_batch(materials, digest=digest)
+
+    for case, case_materials, result in zip(cases, materials, results):
+        with subtests.test(case.name):
+            try:
+                client.run(*client.build_verify_args(case_materials, digest=digest))
+                individual_success = True
+            except ClientFail:
+                individual_success = False
+
+            assert (result.returncode == 0) == individual_success, (
+                f"verify-bundles {'accepted' if result.returncode == 0 else 'rejected'} "
+                f"{case.name}, verify-bundle did not: {result.stderr}"
+            )
+
+
 @pytest.mark.signing
 @pytest.mark.staging
 def test_sign_does_not_produce_root(
@@ -124,7 +164,17 @@ def test_sign_verify_rekor2(
     SKIP_CPYTHON_RELEASE_TESTS, reason="CPython release bundle tests explicitly skipped"
 )
 @pytest.mark.skipif(not GITHUB_WORKSPACE, reason="GITHUB_WORKSPACE not set")
-def test_verify_cpython_release_bundles(subtests, client):
+def test_verify_cpython_release_bundles(subtests, pytestconfig, client, client_concurrency):
+    """
+    Verify CPython release bundles: by default the first bundle of each release, with
+    `--cpython-release-sweep` every bundle of every release.
+
+    With `--cpython-release-shard=I/N` only the I:th of N deterministic shards of the
+    selected bundles is verified.
+    """
+    sweep = pytestconfig.getoption("--cpython-release-sweep")
+    shard, shards = pytestconfig.getoption("--cpython-release-shard")
+
     cpython_release_dir = Path(GITHUB_WORKSPACE) / "cpython-release-tracker"
     if not cpython_release_dir.is_dir():
         pytest.skip("cpython-release-tracker data is not available")
@@ -143,48 +193,70 @@ def test_verify_cpython_release_bundles(subtests, client):
 
         return next((ident for ident in identities if ident["Release"] == version), None)
 
-    def temp_bundle_path(bundle: dict) -> Path:
-        # We let the system dispose of these after process teardown.
-        tmpfile = tempfile.NamedTemporaryFile(mode="w+t", suffix=".sigstore.json", delete=False)
-        tmpfile.write(json.dumps(bundle))
-        tmpfile.close()
-
-        return Path(tmpfile.name)
-
-    versions = cpython_release_dir / "versions"
-    for version_path in versions.glob("*.json"):
-        ident = version_path_to_identity(version_path)
-        if not ident:
-            continue
-
-        version = json.loads(version_path.read_text())
-        for artifact in version:
-            bundle = artifact.get("sigstore")
-            if not bundle:
-                continue
-            with subtests.test(artifact["url"]):
-                bundle_path = temp_bundle_path(bundle)
-                sha256 = artifact["sha256"]
+    # Verifications run concurrently from one event loop, each in its own client process
+    async_client = AsyncSigstoreClient(
+        client.entrypoint,
+        client.identity_token,
+        client.staging,
+        concurrency=client_concurrency,
+        timeouts=client.timeouts,
+        result_cache=client.result_cache,
+    )
 
-                # NOTE: We currently do this completely manually,
-                # since the client verify APIs are baked around
-                # the assumption of a static identity.
+    async def verify(bundle_path: Path, ident: dict[str, Any], sha256: str) -> None:
+        # NOTE: We currently do this completely manually,
+        # since the client verify APIs are baked around
+        # the assumption of a static identity.
+        await async_client.run(
+            "verify-bundle",
+            "--bundle",
+            str(bundle_path),
+            "--certificate-identity",
+            ident["Release manager"],
+            "--certificate-oidc-issuer",
+            ident["OIDC Issuer"],
+            f"sha256:{sha256}",
+        )
+
+    async def verify_all(jobs: dict[str, Coroutine[Any, Any, None]]) -> None:
+        # All verifications start right away, results are reported as subtests in
+        # submission order as soon as they are available
+        tasks = {url: asyncio.create_task(job) for url, job in jobs.items()}
+        for url, task in tasks.items():
+            with subtests.test(url):
+                # A `ClientTimeout` is raised as is, so that the subtest is reported as
+                # timed out (see conftest.py)
+                error: ClientFail | None = None
                 try:
-                    client.run(
-                        "verify-bundle",
-                        "--bundle",
-                        str(bundle_path),
-                        "--certificate-identity",
-                        ident["Release manager"],
-                        "--certificate-oidc-issuer",
-                        ident["OIDC Issuer"],
-                        f"sha256:{sha256}",
-                    )
+                    await task
                 except ClientFail as e:
-                    pytest.fail(f"verify for {artifact['url']} failed: {e}")
+                    error = e
+                if error is not None:
+                    pytest.fail(f"verify for {url} failed: {error}")
+
+    jobs: dict[str, Coroutine[Any, Any, None]] = {}
+    with tempfile.TemporaryDirectory() as bundle_dir:
+        versions = cpython_release_dir / "versions"
+        for version_path in sorted(versions.glob("*.json")):
+            ident = version_path_to_identity(version_path)
+            if not ident:
+                continue
 
-                # One verification per release is enough
-                break
+            # Bundles are decoded one artifact at a time and written out re-encoded
+            for artifact in iter_release_artifacts(version_path):
+                # Shards are based on the artifact URL only, so that they are stable
+                # across runs and machines
+                url_digest = hashlib.sha256(artifact.url.encode()).digest()
+                if int.from_bytes(url_digest[:8], "big") % shards == shard - 1:
+                    bundle_path = Path(bundle_dir, f"{len(jobs)}.sigstore.json")
+                    bundle_path.write_bytes(artifact.bundle)
+                    jobs[artifact.url] = verify(bundle_path, ident, artifact.sha256)
+
+                # One verification per release is enough, unless sweeping all artifacts
+                if not sweep:
+                    break
+
+        asyncio.run(verify_all(jobs))
 
 
 @pytest.mark.signing
@@ -0,0 +1,159 @@
+import random
+from pathlib import Path
+from typing import NamedTuple
+
+import pytest  # type: ignore
+
+from test import oidc
+from test.client import BundleMaterials, Invocation, SigstoreClient
+from test.conftest import ArtifactInputType, _entrypoint
+from test.local_services import LocalServices
+
+# These tests are only collected with `--large-artifact-size`: see conftest.py
+pytestmark = [pytest.mark.large_artifact, pytest.mark.signing, pytest.mark.staging]
+
+_CHUNK_SIZE = 1024 * 1024
+# Peak RSS varies between client processes by a few MiB regardless of the artifact size
+_RSS_SLACK = 32 * 1024 * 1024
+
+
+@pytest.fixture(scope="session")
+def large_artifact(pytestconfig, tmp_path_factory) -> Path:
+    """
+    Generate the large artifact once per session: pseudo-random contents that are
+    deterministic from `--large-artifact-seed`, or a sparse file of zeros.
+    """
+    size = pytestconfig.getoption("--large-artifact-size") * _CHUNK_SIZE
+    path = tmp_path_factory.mktemp("large-artifact") / "large-artifact.bin"
+
+    with path.open("wb") as f:
+        if pytestconfig.getoption("--large-artifact-sparse"):
+            f.truncate(size)
+        else:
+            rng = random.Random(pytestconfig.getoption("--large-artifact-seed"))
+            for _ in range(size // _CHUNK_SIZE):
+                f.write(rng.randbytes(_CHUNK_SIZE))
+
+    return path
+
+
+class _SignedArtifact(NamedTuple):
+    materials: BundleMaterials
+    sign: Invocation
+    baseline_sign: Invocation
+    baseline_verify: Invocation
+
+
+def _measured_client(pytestconfig) -> SigstoreClient:
+    """
+    Return a client that runs separate client processes: peak RSS is not known in
+    server mode.
+    """
+    return SigstoreClient(
+        _entrypoint(pytestconfig),
+        oidc.identity_token(pytestconfig.getoption("--identity-token")),
+        pytestconfig.getoption("--staging"),
+        server_mode=False,
+        timeouts=dict(pytestconfig.getoption("--client-timeout")),
+    )
+
+
+def _sign_measured(
+    client: SigstoreClient, local_services: LocalServices | None, artifact: Path
+) -> tuple[BundleMaterials, Invocation]:
+    materials = BundleMaterials.from_artifact_path(artifact)
+    if local_services is not None:
+        materials.trusted_root, materials.signing_config = local_services.config
+    client.sign(materials)
+    assert client.last_invocation is not None
+    return materials, client.last_invocation
+
+
+@pytest.fixture(scope="module")
+def signed_large_artifact(
+    pytestconfig, local_services: LocalServices | None, large_artifact: Path, tmp_path_factory
+) -> _SignedArtifact:
+    """
+    Sign the large artifact once for all verification tests.
+
+    A small artifact is signed and verified first: its peak RSS is the baseline for the
+    memory limit, so that the limit includes what the client needs for an operation
+    regardless of the artifact size.
+    """
+    client = _measured_client(pytestconfig)
+
+    small_artifact = tmp_path_factory.mktemp("small-artifact") / "small-artifact.bin"
+    small_artifact.write_bytes(random.Random(0).randbytes(_CHUNK_SIZE))
+    small, baseline_sign = _sign_measured(client, local_services, small_artifact)
+    client.verify(small)
+    assert client.last_invocation is not None
+    baseline_verify = client.last_invocation
+
+    materials, sign = _sign_measured(client, local_services, large_artifact)
+    return _SignedArtifact(materials, sign, baseline_sign, baseline_verify)
+
+
+def _measurement(invocation: Invocation, size: int | None) -> dict:
+    """
+    Return the peak RSS and, for invocations that read the `size` byte artifact, the
+    throughput of a client invocation.
+    """
+    measurement: dict = {"wall_time": invocation.wall_time, "max_rss": invocation.max_rss}
+    if size is not None:
+        measurement["mb_per_s"] = size / 1_000_000 / invocation.wall_time
+    return measurement
+
+
+def _check_rss(operation: str, invocation: Invocation, baseline: Invocation, size: int) -> None:
+    """
+    Check that the peak RSS of `invocation` does not suggest that the client read the
+    `size` byte artifact into memory: that needs at least `size` bytes on top of the
+    `baseline` invocation with a small artifact.
+    """
+    if invocation.max_rss is None or baseline.max_rss is None:
+        return
+    limit = baseline.max_rss + max(size // 2, _RSS_SLACK)
+    assert invocation.max_rss < limit, (
+        f"client peak RSS during {operation} ({invocation.max_rss} bytes) suggests "
+        f"that the {size} byte artifact was read into memory"
+    )
+
+
+@pytest.mark.parametrize("input_type", [ArtifactInputType.PATH, ArtifactInputType.DIGEST], ids=str)
+def test_sign_verify_large_artifact(
+    record_property,
+    pytestconfig,
+    signed_large_artifact: _SignedArtifact,
+    input_type: ArtifactInputType,
+) -> None:
+    """
+    Verify the large artifact, recording peak RSS and throughput of the client as the
+    "large_artifact" property of the test. The client must not read the whole artifact
+    into memory.
+
+    The artifact is signed once for both input types, with the artifact path: the CLI
+    protocol has no digest input for signing.
+    """
+    materials = signed_large_artifact.materials
+    size = materials.artifact.stat().st_size
+    measured_client = _measured_client(pytestconfig)
+
+    if input_type == ArtifactInputType.PATH:
+        measured_client.verify(materials)
+    else:
+        measured_client.verify_digest(materials)
+    verify = measured_client.last_invocation
+    assert verify is not None
+
+    sign = signed_large_artifact.sign
+    record_property(
+        "large_artifact",
+        {
+            "size": size,
+            "sign": _measurement(sign, size),
+            "verify": _measurement(verify, size if input_type == ArtifactInputType.PATH else None),
+        },
+    )
+
+    _check_rss("sign", sign, signed_large_artifact.baseline_sign, size)
+    _check_rss("verify", verify, signed_large_artifact.baseline_verify, size)
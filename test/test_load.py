@@ -0,0 +1,103 @@
+import re
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from statistics import fmean
+
+import pytest  # type: ignore
+
+from test.client import BundleMaterials, SigstoreClient, run_measured
+from test.conftest import _MakeMaterialsByType, _percentile
+
+# These tests are only collected with `--load-signatures`: see conftest.py
+pytestmark = [pytest.mark.load, pytest.mark.signing, pytest.mark.staging]
+
+# Parts of error messages that differ between otherwise identical errors: long
+# numbers (ports, timestamps, process ids) and hex strings (digests, object ids)
+_VARIABLE = re.compile(r"\b(\d{4,}|0x[0-9a-fA-F]+|[0-9a-fA-F]{16,})\b")
+
+
+def _stderr_class(stderr: str) -> str:
+    """
+    Classify a failed client invocation by the last line of its stderr, which is usually
+    the error message (or the exception of a traceback).
+    """
+    lines = [line.strip() for line in stderr.splitlines() if line.strip()]
+    if not lines:
+        return "(no stderr)"
+    return _VARIABLE.sub("…", lines[-1])[:120]
+
+
+@pytest.mark.parametrize("input_name", ["a.txt", "statement.json"])
+def test_load_sign(
+    pytestconfig,
+    record_property,
+    client: SigstoreClient,
+    client_concurrency: int,
+    make_materials_by_type: _MakeMaterialsByType,
+    input_name: str,
+) -> None:
+    """
+    Sign `--load-signatures` times with up to `client_concurrency` concurrent client
+    processes, starting invocations at `--load-rate` per second, and record throughput,
+    latency percentiles and errors (including invocations killed after the `sign-bundle`
+    timeout) as the "load" property of the test.
+
+    All invocations use the same identity token, like a release job that signs many
+    build outputs. Use `--local-services` to not load a public Sigstore instance.
+    """
+    count = pytestconfig.getoption("--load-signatures")
+    rate = pytestconfig.getoption("--load-rate")
+
+    commands = []
+    for i in range(count):
+        materials: BundleMaterials
+        materials = make_materials_by_type(input_name, BundleMaterials)
+        if input_name == "statement.json":
+            materials.statement = materials.artifact
+            materials.artifact = Path("a.txt")
+        materials.bundle = Path(f"load-{i}.sigstore.json")
+        commands.append([client.entrypoint, *client.build_sign_args(materials)])
+
+    timeout = client.timeout_for("sign-bundle")
+    start = time.perf_counter()
+
+    def _sign(i: int):
+        # Invocations start on schedule (when a worker is free), regardless of how long
+        # earlier invocations took
+        if rate > 0:
+            delay = start + i / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        return run_measured(commands[i], timeout)
+
+    with ThreadPoolExecutor(max_workers=client_concurrency) as executor:
+        results = list(executor.map(_sign, range(count)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [invocation.wall_time for _, invocation in results]
+    failures = [process for process, _ in results if process.returncode != 0]
+    load = {
+        "signatures": count,
+        "concurrency": client_concurrency,
+        "rate": rate or None,
+        "elapsed": elapsed,
+        "signatures_per_second": (count - len(failures)) / elapsed,
+        "latency": {
+            "mean": fmean(latencies),
+            "p50": _percentile(latencies, 50),
+            "p90": _percentile(latencies, 90),
+            "p99": _percentile(latencies, 99),
+            "max": max(latencies),
+        },
+        "max_rss": max(invocation.max_rss or 0 for _, invocation in results),
+        "errors": {
+            "timeout": sum(invocation.timed_out for _, invocation in results),
+            "exitcode": dict(Counter(str(process.returncode) for process in failures)),
+            "stderr": dict(Counter(_stderr_class(process.stderr) for process in failures)),
+        },
+    }
+    record_property("load", load)
+
+    assert not failures, f"{len(failures)} of {count} signing invocations failed: {load['errors']}"
@@ -0,0 +1,116 @@
+"""
+Trusted roots and signing configs of the Sigstore instances, cached across test runs.
+
+The trust material is fetched with TUF by the selftest client and shared by all test
+processes: the TUF repository is only consulted when the last successful refresh is
+older than the configured TTL.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from urllib import parse
+
+import platformdirs
+
+TRUSTED_ROOT = "trusted_root.json"
+SIGNING_CONFIG = "signing_config.v0.2.json"
+
+
+def environment_name(staging: bool) -> str:
+    return "staging" if staging else "production"
+
+
+def _update_client_config(project_root: Path, staging: bool) -> tuple[Path, Path]:
+    """Return paths to (up-to-date) TrustedRoot and SigningConfig in sigstore-python cache
+
+    This uses the internal selftest client feature 'update-trust-root'
+    """
+    if staging:
+        cmd = [str(project_root / "selftest-client"), "--staging", "update-trust-root"]
+        repo = parse.quote("https://tuf-repo-cdn.sigstage.dev", safe="")
+    else:
+        cmd = [str(project_root / "selftest-client"), "update-trust-root"]
+        repo = parse.quote("https://tuf-repo-cdn.sigstore.dev", safe="")
+
+    # run the selftest client to update files in sigstore-python cache
+    subprocess.run(cmd, check=True)
+
+    # then find files in sigstore-python cache
+    cache_dir = platformdirs.user_cache_path("sigstore-python") / "tuf" / repo
+    tr = cache_dir / TRUSTED_ROOT
+    sc = cache_dir / SIGNING_CONFIG
+    assert tr.exists()
+    assert sc.exists()
+
+    return (tr, sc)
+
+
+def pinned_trust_material(directory: Path, staging: bool) -> tuple[Path, Path] | None:
+    """
+    Return the TrustedRoot and SigningConfig of the snapshot in `directory`, None if the
+    snapshot does not contain them.
+    """
+    material_dir = directory / environment_name(staging)
+    tr = material_dir / TRUSTED_ROOT
+    sc = material_dir / SIGNING_CONFIG
+    if not tr.exists() or not sc.exists():
+        return None
+    return (tr, sc)
+
+
+def cached_trust_material(project_root: Path, staging: bool, ttl: float) -> tuple[Path, Path]:
+    """
+    Return paths to TrustedRoot and SigningConfig that were refreshed less than `ttl`
+    seconds ago, refreshing them with the selftest client in `project_root` if needed.
+    """
+    material_dir = (
+        platformdirs.user_cache_path("sigstore-conformance")
+        / "trust-material"
+        / environment_name(staging)
+    )
+    material_dir.mkdir(parents=True, exist_ok=True)
+    tr = material_dir / TRUSTED_ROOT
+    sc = material_dir / SIGNING_CONFIG
+    last_refresh = material_dir / "last-refresh"
+
+    # Only one test process refreshes the trust material at a time
+    with (material_dir / ".lock").open("w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+
+        try:
+            fresh = time.time() - float(last_refresh.read_text()) < ttl
+        except (OSError, ValueError):
+            fresh = False
+
+        if not (fresh and tr.exists() and sc.exists()):
+            updated_tr, updated_sc = _update_client_config(project_root, staging=staging)
+            # Processes that already use the cached files may be reading them
+            for updated, cached in ((updated_tr, tr), (updated_sc, sc)):
+                tmp = cached.with_suffix(".tmp")
+                shutil.copyfile(updated, tmp)
+                os.replace(tmp, cached)
+            last_refresh.write_text(str(time.time()))
+
+    return (tr, sc)
+
+
+def snapshot_trust_material(
+    project_root: Path, staging: bool, ttl: float, directory: Path
+) -> tuple[Path, Path]:
+    """
+    Copy the cached trust material into a snapshot in `directory` (see
+    `pinned_trust_material()`), so that several test runs use identical trust material.
+    """
+    material_dir = directory / environment_name(staging)
+    material_dir.mkdir(parents=True, exist_ok=True)
+    snapshot = []
+    for cached in cached_trust_material(project_root, staging, ttl):
+        shutil.copyfile(cached, material_dir / cached.name)
+        snapshot.append(material_dir / cached.name)
+    return (snapshot[0], snapshot[1])